@@ -1,6 +1,7 @@
-from RAG_engine.indexer import load_jd_and_resume, split_documents
+from RAG_engine.indexer import load_jd_and_resume, split_documents, load_document, split_document
 from RAG_engine.retriever import (
     create_vectorstores,
+    create_vectorstore,
     get_retrievers,
     load_existing_vectorstore,
     get_embedding_model
@@ -10,8 +11,11 @@ __all__ = [
     # Indexer
     "load_jd_and_resume",
     "split_documents",
+    "load_document",
+    "split_document",
     # Retriever
     "create_vectorstores",
+    "create_vectorstore",
     "get_retrievers",
     "load_existing_vectorstore",
     "get_embedding_model",
@@ -1,5 +1,7 @@
 from typing import List, Tuple
-from langchain_community.document_loaders import PyPDFLoader
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from langchain_community.document_loaders import PyPDFium2Loader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 from utils.logger import get_logger
@@ -7,35 +9,60 @@ from utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+def load_document(path: str) -> List[Document]:
+    """Parse a single PDF into pages"""
+    try:
+        return PyPDFium2Loader(path).load()
+    except Exception as e:
+        logger.error(f"Error loading PDF '{path}': {e}")
+        raise RuntimeError(f"Failed to load document: {e}")
+
+
 def load_jd_and_resume(jd_path: str, resume_path: str) -> Tuple[List[Document], List[Document]]:
     
-    jd_loader = PyPDFLoader(jd_path)
-    resume_loader = PyPDFLoader(resume_path)
+    # Parse both PDFs concurrently; load_document logs and raises per file
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        jd_future = executor.submit(load_document, jd_path)
+        resume_future = executor.submit(load_document, resume_path)
+        pages, resume = jd_future.result(), resume_future.result()
     
-    try:
-        pages = jd_loader.load()
-        resume = resume_loader.load()
-        logger.info(f"Loaded {len(pages)} pages from JD and {len(resume)} pages from resume.")
-        return pages, resume
-    except Exception as e:
-        logger.error(f"Error loading PDFs: {e}")
-        raise RuntimeError(f"Failed to load documents: {e}")
+    logger.info(f"Loaded {len(pages)} pages from JD and {len(resume)} pages from resume.")
+    return pages, resume
+
+
+@lru_cache(maxsize=4)
+def _get_text_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    # Sizes are in tokens so chunks line up with what the embedding model bills
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name="cl100k_base",
+        chunk_size=chunk_size, 
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", ". ", " ", ""]
+    )
+
+
+def split_document(
+    pages: List[Document],
+    chunk_size: int = 450,
+    chunk_overlap: int = 50
+) -> List[Document]:
+    """Split one document's pages into chunks"""
+    return _get_text_splitter(chunk_size, chunk_overlap).split_documents(pages)
 
 
 def split_documents(
     pages: List[Document], 
     resume: List[Document],
-    chunk_size: int = 1000,
-    chunk_overlap: int = 200
+    chunk_size: int = 450,
+    chunk_overlap: int = 50
 ) -> Tuple[List[Document], List[Document]]:
 
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size, 
-        chunk_overlap=chunk_overlap
-    )
+    text_splitter = _get_text_splitter(chunk_size, chunk_overlap)
     
-    page_chunks = text_splitter.split_documents(pages)
-    resume_chunks = text_splitter.split_documents(resume)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        jd_future = executor.submit(text_splitter.split_documents, pages)
+        resume_future = executor.submit(text_splitter.split_documents, resume)
+        page_chunks, resume_chunks = jd_future.result(), resume_future.result()
 
     logger.info(f"JD split into {len(page_chunks)} chunks")
     logger.info(f"Resume split into {len(resume_chunks)} chunks")
@@ -1,10 +1,26 @@
-from langchain_chroma import Chroma
+import os
+import time
+import hashlib
+import threading
+from typing import List, Optional
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from os import getenv
+
+import numpy as np
+from pydantic import PrivateAttr
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStoreRetriever
+
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-# Lazy imports to avoid API validation at module load time
+# Maximum number of embedding batches in flight per collection
+EMBED_CONCURRENCY = 4
+
+# Lazy imports to avoid API validation and heavy imports at module load time
 _OpenAIEmbeddings = None
 _GoogleGenerativeAIEmbeddings = None
 
@@ -26,16 +42,25 @@ def _import_embeddings():
             logger.warning(f"Failed to import GoogleGenerativeAIEmbeddings: {e}")
 
 
+@lru_cache(maxsize=1)
 def get_embedding_model():
+    """Build the embedding model once per process; use cache_clear() to reset"""
     _import_embeddings()
     
     # Try OpenAI via OpenRouter first
     if _OpenAIEmbeddings and getenv("OPENROUTER_API_KEY"):
         try:
+            import httpx
+            # One pooled keep-alive client for every embedding batch
+            http_client = httpx.Client(
+                timeout=60.0,
+                limits=httpx.Limits(max_keepalive_connections=16, max_connections=32)
+            )
             embedding = _OpenAIEmbeddings(
                 model="text-embedding-3-small",
                 api_key=getenv("OPENROUTER_API_KEY"),
-                base_url="https://openrouter.ai/api/v1"
+                base_url="https://openrouter.ai/api/v1",
+                http_client=http_client
             )
             logger.info("Initialized OpenAI Embeddings via OpenRouter.")
             return embedding
@@ -55,40 +80,191 @@ def get_embedding_model():
     raise RuntimeError("No embedding model available. Please set OPENROUTER_API_KEY or GOOGLE_API_KEY.")
 
 
-def create_vectorstores(jd_chunks, resume_chunks, 
-                        jd_collection="interview-jd",
-                        resume_collection="candidate-resume",
-                        persist_dir="./chroma_db"):
+def _chunk_id(chunk) -> str:
+    return hashlib.md5(chunk.page_content.encode("utf-8")).hexdigest()
+
+
+def _build_vectorstore(chunks, embedding, collection_name, persist_dir, batch_size):
+    """Embed chunks outside Chroma and insert them in fixed-size batches"""
+    store_path = f"{persist_dir}/{collection_name}"
+    store_exists = os.path.exists(store_path)
+    from langchain_chroma import Chroma
+    store = Chroma(
+        collection_name=collection_name,
+        embedding_function=embedding,
+        persist_directory=store_path
+    )
+    
+    # Content-hash ids make re-indexing the same document a no-op
+    unique = {}
+    for chunk in chunks:
+        unique.setdefault(_chunk_id(chunk), chunk)
+    
+    # Warm run: the persisted collection holds exactly this document's chunks.
+    # Comparing ids, not counts, catches an edited document of the same length.
+    indexed = set(store._collection.get(include=[])["ids"]) if store_exists else set()
+    if unique and indexed == unique.keys():
+        logger.info(f"Reusing existing vector store '{collection_name}'.")
+        return store
+    
+    existing = indexed & unique.keys()
+    pending = [(cid, c) for cid, c in unique.items() if cid not in existing]
+    
+    # Ids are content hashes, so chunks of an earlier version of the document
+    # would otherwise linger and be retrieved next to the new text
+    stale = list(indexed - unique.keys())
+    if stale:
+        store._collection.delete(ids=stale)
+        logger.info(f"Removed {len(stale)} outdated chunks from '{collection_name}'.")
+    
+    if existing:
+        logger.info(f"Skipping {len(existing)} already-indexed chunks in '{collection_name}'.")
+    
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    batch_texts = [[c.page_content for _, c in batch] for batch in batches]
+    
+    # Embedding slabs are independent HTTP calls, so issue them concurrently
+    with ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY) as executor:
+        batch_vectors = executor.map(embedding.embed_documents, batch_texts)
+        
+        for batch, texts, vectors in zip(batches, batch_texts, batch_vectors):
+            store._collection.add(
+                ids=[cid for cid, _ in batch],
+                documents=texts,
+                metadatas=[{**c.metadata, "chunk_id": cid} for cid, c in batch],
+                embeddings=vectors
+            )
+    
+    # Older Chroma wrappers need an explicit flush; do it once, not per batch
+    if pending and hasattr(store, "persist"):
+        store.persist()
+    
+    return store
+
+
+def _build_faiss_store(chunks, embedding, collection_name, persist_dir):
+    """Build a FAISS index for bulk workloads where Chroma persistence is slow"""
+    from langchain_community.vectorstores import FAISS
+    store = FAISS.from_documents(chunks, embedding)
+    store.save_local(f"{persist_dir}/{collection_name}")
+    return store
+
+
+def create_vectorstore(chunks, collection_name,
+                       persist_dir="./chroma_db",
+                       batch_size=128,
+                       backend="chroma",
+                       label="document"):
 
     embedding = get_embedding_model()
     
     try:
-        jd_store = Chroma.from_documents(
-            documents=jd_chunks,
-            embedding=embedding,
-            collection_name=jd_collection,
-            persist_directory=f"{persist_dir}/{jd_collection}"
-        )
-        logger.info(f"Created JD vector store with {len(jd_chunks)} chunks.")
+        if backend == "faiss":
+            store = _build_faiss_store(chunks, embedding, collection_name, persist_dir)
+        else:
+            store = _build_vectorstore(chunks, embedding, collection_name, persist_dir, batch_size)
+        logger.info(f"Created {label} vector store with {len(chunks)} chunks.")
+        return store
     except Exception as e:
-        logger.error(f"Error creating JD vector store: {e}")
-        raise RuntimeError(f"Failed to create JD vector store: {e}")
+        logger.error(f"Error creating {label} vector store: {e}")
+        raise RuntimeError(f"Failed to create {label} vector store: {e}")
+
+
+def create_vectorstores(jd_chunks, resume_chunks, 
+                        jd_collection="interview-jd",
+                        resume_collection="candidate-resume",
+                        persist_dir="./chroma_db",
+                        batch_size=128,
+                        backend="chroma"):
+
+    def _build(chunks, collection_name, label):
+        return create_vectorstore(chunks, collection_name, persist_dir, batch_size, backend, label)
     
-    try:
-        resume_store = Chroma.from_documents(
-            documents=resume_chunks,
-            embedding=embedding,
-            collection_name=resume_collection,
-            persist_directory=f"{persist_dir}/{resume_collection}"
-        )
-        logger.info(f"Created resume vector store with {len(resume_chunks)} chunks.")
-    except Exception as e:
-        logger.error(f"Error creating resume vector store: {e}")
-        raise RuntimeError(f"Failed to create resume vector store: {e}")
+    # JD and resume stores are independent, so embed them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        jd_future = executor.submit(_build, jd_chunks, jd_collection, "JD")
+        resume_future = executor.submit(_build, resume_chunks, resume_collection, "resume")
+        jd_store, resume_store = jd_future.result(), resume_future.result()
     
     return jd_store, resume_store
 
 
+class SemanticCacheRetriever(BaseRetriever):
+    """Serve near-duplicate queries ("SQL join questions" asked twice in a
+    session) from memory. A hit costs one query embedding and a dot product
+    against at most max_entries cached query vectors; a miss reuses that
+    embedding for the vector search, so it costs nothing extra."""
+    
+    retriever: VectorStoreRetriever
+    threshold: float = 0.92
+    max_entries: int = 128
+    ttl: float = 3600.0
+    
+    _vectors: Optional[np.ndarray] = PrivateAttr(default=None)
+    _docs: list = PrivateAttr(default_factory=list)
+    _created: list = PrivateAttr(default_factory=list)
+    _last_used: list = PrivateAttr(default_factory=list)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    
+    def _drop(self, keep: List[int]):
+        self._vectors = self._vectors[keep] if keep else None
+        self._docs = [self._docs[i] for i in keep]
+        self._created = [self._created[i] for i in keep]
+        self._last_used = [self._last_used[i] for i in keep]
+    
+    def _lookup(self, vector: np.ndarray, now: float):
+        if self._vectors is None:
+            return None
+        
+        fresh = [i for i, created in enumerate(self._created) if now - created < self.ttl]
+        if len(fresh) < len(self._created):
+            self._drop(fresh)
+            if self._vectors is None:
+                return None
+        
+        sims = self._vectors @ vector
+        best = int(sims.argmax())
+        if sims[best] < self.threshold:
+            return None
+        self._last_used[best] = now
+        return self._docs[best]
+    
+    def _insert(self, vector: np.ndarray, docs, now: float):
+        if self._vectors is not None and len(self._docs) >= self.max_entries:
+            # Evict the least recently used entry
+            oldest = min(range(len(self._last_used)), key=self._last_used.__getitem__)
+            self._drop([i for i in range(len(self._docs)) if i != oldest])
+        
+        row = vector[np.newaxis, :]
+        self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+        self._docs.append(docs)
+        self._created.append(now)
+        self._last_used.append(now)
+    
+    def _get_relevant_documents(self, query: str, *, run_manager) -> List[Document]:
+        store = self.retriever.vectorstore
+        embeddings = getattr(store, "embeddings", None)
+        if embeddings is None or self.retriever.search_type != "similarity":
+            return self.retriever.invoke(query)
+        
+        raw = embeddings.embed_query(query)
+        vector = np.asarray(raw, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        
+        now = time.monotonic()
+        with self._lock:
+            cached = self._lookup(vector, now)
+        if cached is not None:
+            return cached
+        
+        docs = store.similarity_search_by_vector(raw, **self.retriever.search_kwargs)
+        with self._lock:
+            self._insert(vector, docs, now)
+        return docs
+
+
 def get_retrievers(jd_store, resume_store, search_type="similarity"):
     
     jd_retriever = jd_store.as_retriever(search_type=search_type)
@@ -98,16 +274,26 @@ def get_retrievers(jd_store, resume_store, search_type="similarity"):
     return jd_retriever, resume_retriever
 
 
-def load_existing_vectorstore(collection_name, persist_dir="./chroma_db"):
+def load_existing_vectorstore(collection_name, persist_dir="./chroma_db", backend="chroma"):
 
     embedding = get_embedding_model()
     
     try:
-        store = Chroma(
-            collection_name=collection_name,
-            embedding_function=embedding,
-            persist_directory=f"{persist_dir}/{collection_name}"
-        )
+        if backend == "faiss":
+            from langchain_community.vectorstores import FAISS
+            # Index files are written by this module, so deserializing them is safe
+            store = FAISS.load_local(
+                f"{persist_dir}/{collection_name}",
+                embedding,
+                allow_dangerous_deserialization=True
+            )
+        else:
+            from langchain_chroma import Chroma
+            store = Chroma(
+                collection_name=collection_name,
+                embedding_function=embedding,
+                persist_directory=f"{persist_dir}/{collection_name}"
+            )
         logger.info(f"Loaded existing vector store: {collection_name}")
         return store
     except Exception as e:
@@ -1,10 +1,16 @@
 import os
+import re
 import sys
 import uuid
+import struct
+import shutil
+import hashlib
 import time
 import asyncio
+import functools
 import tempfile
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple, List
 
 import gradio as gr
@@ -46,53 +52,106 @@ else:
 # Global session storage
 active_sessions = {}
 
+# Dedicated pool for blocking workflow (LLM/RAG) calls, so slow interviews
+# don't starve the default executor used for audio and file I/O
+_WORKFLOW_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.max_concurrent_sessions * 2,
+    thread_name_prefix="workflow"
+)
+
+# Generated audio older than this is removed from the audio output directory
+AUDIO_RETENTION_SECONDS = 30 * 60
+AUDIO_PRUNE_INTERVAL_SECONDS = 60
+_last_audio_prune = 0.0
+
 
 # ==================== Helper Functions ====================
 
-def format_time(seconds: int) -> str:
-    """Format seconds into MM:SS display"""
-    mins, secs = divmod(int(seconds), 60)
-    return f"{mins:02d}:{secs:02d}"
+# RE2 guarantees linear-time matching on malformed model output; fall back to re
+try:
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
+
+# Cleanup rules applied in order: (literal needles, pattern, replacement).
+# A rule with needles only runs when one of them is present, so every needle
+# must be a literal that any match of the pattern necessarily contains. Rules
+# whose only such literal is common in prose (':' or '/') have None and always run.
+# Independent patterns are merged into single alternations so the text is
+# scanned once per group instead of once per pattern.
+_CLEAN_RULES = [
+    # Tool/function call syntax and code blocks
+    (('<function=', '{"function"', '<tool_call>', '```'), _re_engine.compile(
+        r'<function=[^>]*>[^<]*</function>'
+        r'|\{"function"[^}]+\}'
+        r'|(?s:<tool_call>.*?</tool_call>)'
+        r'|(?s:```[^`]*```)'
+    ), ''),
+    # Tool result messages (Report saved, file paths, etc.)
+    (('content=',), _re_engine.compile(r'(?s)content=[\'"].*?[\'"]\s*name=[\'"].*?[\'"].*'), ''),
+    (('✅',), _re_engine.compile(r'(?i)✅.*?(saved|created|generated).*?(\.pdf|\.txt|\.docx).*'), ''),
+    (None, _re_engine.compile(r'(?i)Report.*?saved.*?:'), ''),
+    # File paths, tool IDs and technical output
+    (None, _re_engine.compile(
+        r'[A-Za-z]:\\[^\s]+'
+        r'|/[\w/]+\.[a-z]+'
+        r'|tool_call_id=[\'"][^\'"]+[\'"]'
+        r'|id=[\'"][^\'"]+[\'"]'
+    ), ''),
+]
 
 
 def clean_ai_response(text: str) -> str:
     """Remove any tool/function call syntax from AI response"""
-    import re
-    
-    # Remove <function=...>...</function> tags
-    text = re.sub(r'<function=[^>]*>[^<]*</function>', '', text)
-    
-    # Remove {"function": ...} JSON blocks
-    text = re.sub(r'\{"function"[^}]+\}', '', text)
-    
-    # Remove <tool_call>...</tool_call> tags
-    text = re.sub(r'<tool_call>.*?</tool_call>', '', text, flags=re.DOTALL)
-    
-    # Remove ```...``` code blocks
-    text = re.sub(r'```[^`]*```', '', text, flags=re.DOTALL)
-    
-    # Remove tool result messages (Report saved, file paths, etc.)
-    text = re.sub(r'content=[\'"].*?[\'"]\s*name=[\'"].*?[\'"].*', '', text, flags=re.DOTALL)
-    text = re.sub(r'✅.*?(saved|created|generated).*?(\.pdf|\.txt|\.docx).*', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'Report.*?saved.*?:', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'[A-Za-z]:\\[^\s]+', '', text)  # Remove Windows file paths
-    text = re.sub(r'/[\w/]+\.[a-z]+', '', text)  # Remove Unix file paths
-    
-    # Remove tool IDs and technical output
-    text = re.sub(r'id=[\'"][^\'"]+[\'"]', '', text)
-    text = re.sub(r'tool_call_id=[\'"][^\'"]+[\'"]', '', text)
+    return _clean_cached(text)
+
+
+@functools.lru_cache(maxsize=512)
+def _clean_cached(text: str) -> str:
+    for needles, pattern, replacement in _CLEAN_RULES:
+        if needles is None or any(needle in text for needle in needles):
+            text = pattern.sub(replacement, text)
     
     # Clean up extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    return ' '.join(text.split())
+
+
+# Per-dtype scale factors that map integer PCM into [-1, 1]
+_PCM_SCALE = {
+    np.int16: 1.0 / 32768.0,
+    np.int32: 1.0 / 2147483648.0,
+    np.uint8: 1.0 / 128.0,
+}
+
+
+_WAV_HEADER_SIZE = 44
+
+
+def _pcm16_wav_bytes(samples: np.ndarray, sample_rate: int) -> bytearray:
+    """Frame mono PCM samples as a 16-bit WAV without an encoder round-trip.
+    Float input is expected in [-1, 1]; int16 input is written as-is."""
+    if samples.dtype != np.int16:
+        samples = np.clip(samples, -1.0, 1.0) * 32767.0
+        samples = samples.astype(np.int16)
     
-    return text
+    # Write header and samples into one pre-sized buffer instead of
+    # concatenating a header with a tobytes() copy of the payload. The buffer
+    # is returned as-is; converting it to bytes would copy the payload again.
+    data_size = samples.size * 2
+    wav = bytearray(_WAV_HEADER_SIZE + data_size)
+    struct.pack_into(
+        '<4sI4s4sIHHIIHH4sI', wav, 0,
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b'data', data_size
+    )
+    np.frombuffer(wav, dtype='<i2', offset=_WAV_HEADER_SIZE)[:] = samples
+    return wav
 
 
 def audio_input_to_bytes(audio_input) -> bytes:
     """Convert Gradio audio input to WAV bytes.
     Handles both numpy tuple (sr, array) and filepath string formats."""
-    import io
-    import soundfile as sf
     
     if audio_input is None:
         return None
@@ -114,44 +173,107 @@ def audio_input_to_bytes(audio_input) -> bytes:
         
         # Handle numpy array
         if isinstance(audio_data, np.ndarray):
-            # Normalize audio data
-            if audio_data.dtype == np.int16:
-                audio_data = audio_data.astype(np.float32) / 32768.0
-            elif audio_data.dtype == np.int32:
-                audio_data = audio_data.astype(np.float32) / 2147483648.0
-            elif audio_data.dtype == np.uint8:
-                audio_data = (audio_data.astype(np.float32) - 128) / 128.0
+            # Mono int16 (the common microphone case) is already WAV-ready PCM
+            if audio_data.dtype == np.int16 and audio_data.ndim == 1:
+                return _pcm16_wav_bytes(audio_data, int(sample_rate))
+            
+            # Normalize audio data: cast once, then offset/scale in place
+            scale = _PCM_SCALE.get(audio_data.dtype.type)
+            if scale is not None:
+                is_unsigned = audio_data.dtype == np.uint8
+                audio_data = audio_data.astype(np.float32)
+                if is_unsigned:
+                    audio_data -= 128.0
+                audio_data *= scale
+            else:
+                # Float input: narrow to float32 rather than carrying float64 through
+                audio_data = audio_data.astype(np.float32, copy=False)
             
-            # Convert to mono if stereo
-            if len(audio_data.shape) > 1:
-                audio_data = audio_data.mean(axis=1)
+            # Convert to mono if stereo, staying in float32 throughout
+            if audio_data.ndim > 1:
+                if audio_data.shape[1] == 2:
+                    audio_data = (audio_data[:, 0] + audio_data[:, 1]) * np.float32(0.5)
+                else:
+                    audio_data = np.mean(audio_data, axis=1, dtype=np.float32)
             
-            # Write to bytes buffer
-            buffer = io.BytesIO()
-            sf.write(buffer, audio_data, sample_rate, format='WAV')
-            buffer.seek(0)
-            return buffer.read()
+            return _pcm16_wav_bytes(audio_data, int(sample_rate))
     
     logger.error(f"Unexpected audio input type: {type(audio_input)}")
     return None
 
 
-def save_audio_to_temp_file(audio_bytes: bytes, suffix: str = ".mp3") -> str:
+def _prune_voice_outputs(temp_dir: Path, max_age: float):
+    """Delete generated audio files that have not been used for max_age seconds"""
+    cutoff = time.time() - max_age
+    for path in temp_dir.glob("*.mp3"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+async def save_audio_to_temp_file(audio_bytes: bytes, suffix: str = ".mp3") -> str:
     """Save audio bytes to a temporary file for playback"""
-    temp_dir = Path("voice_outputs")
+    global _last_audio_prune
+    temp_dir = Path(settings.audio_output_dir)
     temp_dir.mkdir(exist_ok=True)
     
-    temp_path = temp_dir / f"response_{uuid.uuid4().hex[:8]}{suffix}"
-    with open(temp_path, "wb") as f:
-        f.write(audio_bytes)
+    # Evict stale per-turn files so long-running servers don't accumulate them
+    now = time.time()
+    if now - _last_audio_prune > AUDIO_PRUNE_INTERVAL_SECONDS:
+        _last_audio_prune = now
+        await asyncio.to_thread(_prune_voice_outputs, temp_dir, AUDIO_RETENTION_SECONDS)
+    
+    temp_path = temp_dir / f"response_{uuid.uuid4().bytes[:4].hex()}{suffix}"
+    await asyncio.to_thread(temp_path.write_bytes, audio_bytes)
     
     return str(temp_path)
 
 
+async def run_workflow_call(fn, *args):
+    """Run a blocking InterviewSession method on the workflow executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_WORKFLOW_EXECUTOR, fn, *args)
+
+
+async def synthesize_to_cached_file(text: str) -> str:
+    """Synthesize speech for text, reusing the file if this text was spoken before"""
+    key = hashlib.blake2b(
+        f"{settings.tts_voice}|{settings.tts_rate}|{text}".encode("utf-8"),
+        digest_size=16
+    ).hexdigest()
+    cached_path = Path(settings.audio_output_dir) / f"tts_{key}.mp3"
+    if cached_path.exists():
+        try:
+            os.utime(cached_path)  # keep frequently reused audio out of pruning
+            return str(cached_path)
+        except OSError:
+            pass  # pruned in the meantime; synthesize again
+    
+    audio_bytes = await tts_synthesize(text)
+    temp_path = await save_audio_to_temp_file(audio_bytes)
+    # Atomic rename so concurrent readers never see a partial file
+    os.replace(temp_path, cached_path)
+    return str(cached_path)
+
+
+def _link_or_copy(src: str, dst: str):
+    """Hardlink an uploaded file into place, copying bytes only across filesystems"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
 # ==================== Interview Session Manager ====================
 
 def format_chat_history(history: List) -> List[dict]:
     """Convert chat history to Gradio messages format"""
+    # Already in messages format (the normal case): return as-is
+    if not history or isinstance(history[0], dict):
+        return history
+    
     messages = []
     for item in history:
         if isinstance(item, tuple):
@@ -229,10 +351,11 @@ async def setup_interview(
         jd_path = str(upload_dir / f"{session_id}_jd{Path(jd_file.name).suffix}")
         resume_path = str(upload_dir / f"{session_id}_resume{Path(resume_file.name).suffix}")
         
-        # Copy files
-        import shutil
-        shutil.copy(jd_file.name, jd_path)
-        shutil.copy(resume_file.name, resume_path)
+        # Copy files (off the event loop so other sessions stay responsive)
+        await asyncio.gather(
+            asyncio.to_thread(_link_or_copy, jd_file.name, jd_path),
+            asyncio.to_thread(_link_or_copy, resume_file.name, resume_path)
+        )
         
         # Create interview workflow
         workflow = InterviewSession(
@@ -244,7 +367,7 @@ async def setup_interview(
             num_of_q=num_questions,
             num_of_follow_up=num_followup
         )
-        workflow.setup()
+        await run_workflow_call(workflow.setup)
         
         # Store in session state
         session_state["session_id"] = session_id
@@ -295,15 +418,14 @@ async def start_interview(session_state: dict) -> Tuple[str, List, str, dict, gr
     
     try:
         # Start interview
-        response = clean_ai_response(workflow.start_interview("Hello"))
+        response = clean_ai_response(await run_workflow_call(workflow.start_interview, "Hello"))
         
         # If response is empty, provide a default greeting
         if not response.strip():
             response = "Hi there! I'm Sarah, and I'll be conducting your interview today. It's great to meet you! To start, could you tell me a bit about yourself?"
         
         # Generate TTS
-        audio_bytes = await tts_synthesize(response)
-        audio_path = save_audio_to_temp_file(audio_bytes)
+        audio_path = await synthesize_to_cached_file(response)
         
         # Update session state
         session_state["is_active"] = True
@@ -335,6 +457,59 @@ async def start_interview(session_state: dict) -> Tuple[str, List, str, dict, gr
         )
 
 
+DEFAULT_FAREWELL = (
+    "That wraps up our interview for today! It was great talking with you. "
+    "Keep building on your skills, you're doing great. Best of luck, and we'll be in touch soon!"
+)
+
+
+async def _handle_user_turn(
+    workflow,
+    user_text: str,
+    session_state: dict,
+    your_turn_status: str
+) -> Tuple[str, List, str, dict]:
+    """Send one candidate turn to the workflow, voice the reply and record both in the chat history"""
+    
+    # Get AI response
+    raw_response, is_complete = await run_workflow_call(workflow.send_message_with_status, user_text)
+    response = clean_ai_response(raw_response)
+    
+    if not response.strip():
+        # If response is empty but interview completed, use the recruiter's farewell
+        if is_complete:
+            farewell = clean_ai_response(workflow.get_recruiter_farewell())
+            response = farewell if farewell.strip() else DEFAULT_FAREWELL
+        else:
+            response = "That's a good point. Let me ask you about something else."
+    
+    # Generate TTS
+    audio_path = await synthesize_to_cached_file(response)
+    
+    # Update chat history
+    chat_history = session_state.get("chat_history", [])
+    chat_history.append({"role": "user", "content": user_text})
+    chat_history.append({"role": "assistant", "content": response})
+    
+    if is_complete:
+        session_state["is_complete"] = True
+        session_state["is_active"] = False
+        
+        # Add a clear completion indicator to chat
+        chat_history.append({"role": "assistant", "content": "🎉 --- Interview Completed ---"})
+        
+        status = (
+            "🎉 **Interview Complete!**\n\n"
+            "Great job! The interview has ended.\n"
+            "Go to the **Results** tab to see your evaluation and feedback."
+        )
+    else:
+        status = your_turn_status
+    
+    session_state["chat_history"] = chat_history
+    return status, chat_history, audio_path, session_state
+
+
 async def process_audio_response(
     audio_input,
     session_state: dict
@@ -414,63 +589,20 @@ async def process_audio_response(
         
         logger.info(f"Transcribed: {transcript[:50]}...")
         
-        # Get AI response
-        raw_response = workflow.send_message(transcript)
-        response = clean_ai_response(raw_response)
-        is_complete = workflow.is_interview_complete()
-        
-        # If response is empty but interview completed, use the recruiter's farewell
-        if not response.strip() and is_complete:
-            farewell = clean_ai_response(workflow.get_recruiter_farewell())
-            if farewell.strip():
-                response = farewell
-            else:
-                response = "That wraps up our interview for today! It was great talking with you. Keep building on your skills, you're doing great. Best of luck, and we'll be in touch soon!"
-        elif not response.strip():
-            # Check again - maybe it just completed with this response
-            if workflow.is_interview_complete():
-                is_complete = True
-                farewell = clean_ai_response(workflow.get_recruiter_farewell())
-                if farewell.strip():
-                    response = farewell
-                else:
-                    response = "That wraps up our interview for today! It was great talking with you. Keep building on your skills, you're doing great. Best of luck, and we'll be in touch soon!"
-            else:
-                response = "That's a good point. Let me ask you about something else."
-        
-        # Generate TTS
-        audio_bytes = await tts_synthesize(response)
-        audio_path = save_audio_to_temp_file(audio_bytes)
-        
-        # Update chat history
-        chat_history = session_state.get("chat_history", [])
-        chat_history.append({"role": "user", "content": transcript})
-        chat_history.append({"role": "assistant", "content": response})
-        session_state["chat_history"] = chat_history
-        
-        # Check if interview is complete
-        if is_complete:
-            session_state["is_complete"] = True
-            session_state["is_active"] = False
-            
-            # Add a clear completion indicator to chat
-            chat_history.append({"role": "assistant", "content": "🎉 --- Interview Completed ---"})
-            session_state["chat_history"] = chat_history
-            
-            status = (
-                "🎉 **Interview Complete!**\n\n"
-                "Great job! The interview has ended.\n"
-                "Go to the **Results** tab to see your evaluation and feedback."
-            )
-        else:
-            status = "🎙️ **Your turn** - Record your response"
+        status, chat_history, audio_path, session_state = await _handle_user_turn(
+            workflow, transcript, session_state,
+            "🎙️ **Your turn** - Record your response"
+        )
+        is_complete = session_state.get("is_complete", False)
         
         return (
             status,
             chat_history,
             audio_path,
             transcript,
-            session_state
+            session_state,
+            gr.update(interactive=False) if is_complete else gr.update(),
+            gr.update(interactive=False) if is_complete else gr.update()
         )
         
     except Exception as e:
@@ -480,7 +612,9 @@ async def process_audio_response(
             session_state.get("chat_history", []),
             None,
             "",
-            session_state
+            session_state,
+            gr.update(),
+            gr.update()
         )
 
 
@@ -512,55 +646,11 @@ async def process_text_response(
         )
     
     try:
-        # Get AI response
-        raw_response = workflow.send_message(text_input)
-        response = clean_ai_response(raw_response)
-        is_complete = workflow.is_interview_complete()
-        
-        # If response is empty but interview completed, use the recruiter's farewell
-        if not response.strip() and is_complete:
-            farewell = clean_ai_response(workflow.get_recruiter_farewell())
-            if farewell.strip():
-                response = farewell
-            else:
-                response = "That wraps up our interview for today! It was great talking with you. Keep building on your skills, you're doing great. Best of luck, and we'll be in touch soon!"
-        elif not response.strip():
-            # Check again - maybe it just completed with this response
-            if workflow.is_interview_complete():
-                is_complete = True
-                farewell = clean_ai_response(workflow.get_recruiter_farewell())
-                if farewell.strip():
-                    response = farewell
-                else:
-                    response = "That wraps up our interview for today! It was great talking with you. Keep building on your skills, you're doing great. Best of luck, and we'll be in touch soon!"
-            else:
-                response = "That's a good point. Let me ask you about something else."
-        
-        # Generate TTS
-        audio_bytes = await tts_synthesize(response)
-        audio_path = save_audio_to_temp_file(audio_bytes)
-        
-        # Update chat history
-        chat_history = session_state.get("chat_history", [])
-        chat_history.append({"role": "user", "content": text_input})
-        chat_history.append({"role": "assistant", "content": response})
-        session_state["chat_history"] = chat_history
-        
-        if is_complete:
-            session_state["is_complete"] = True
-            session_state["is_active"] = False
-            
-            # Add a clear completion indicator to chat
-            chat_history.append({"role": "assistant", "content": "🎉 --- Interview Completed ---"})
-            session_state["chat_history"] = chat_history
-            
-            status = (
-                "🎉 **Interview Complete!**\n\n"
-                "Great job! The interview has ended.\n"
-                "Go to the **Results** tab to see your evaluation and feedback."
-            )
-        else:
-            status = "🎙️ **Your turn** - Record or type your response"
+        status, chat_history, audio_path, session_state = await _handle_user_turn(
+            workflow, text_input, session_state,
+            "🎙️ **Your turn** - Record or type your response"
+        )
+        is_complete = session_state.get("is_complete", False)
         
         return (
             status,
@@ -597,29 +687,54 @@ async def end_interview(session_state: dict) -> Tuple[str, dict, gr.update, gr.u
     )
 
 
-def get_evaluation_results(session_state: dict) -> Tuple[str, str, str]:
+async def get_evaluation_results(session_state: dict) -> Tuple[str, str, str]:
     """Get evaluation and transcript from the completed interview"""
     
     workflow = session_state.get("workflow")
     if not workflow:
         return "No session data", "", ""
     
-    evaluation = workflow.get_evaluation() or "Evaluation not available yet."
-    hr_report = workflow.get_hr_report() or "HR report not available yet."
-    transcript = workflow.get_transcript() or "No transcript available."
+    evaluation, hr_report, transcript = await asyncio.gather(
+        run_workflow_call(workflow.get_evaluation),
+        run_workflow_call(workflow.get_hr_report),
+        run_workflow_call(workflow.get_transcript)
+    )
+    evaluation = evaluation or "Evaluation not available yet."
+    hr_report = hr_report or "HR report not available yet."
+    transcript = transcript or "No transcript available."
     
     return evaluation, hr_report, transcript
 
 
-def get_timer_display(session_state: dict) -> str:
-    """Get current timer display"""
+def get_timer_elapsed(session_state: dict) -> float:
+    """Get elapsed interview seconds for the client-side timer (-1 when inactive)"""
     
     start_time = session_state.get("start_time")
     if not start_time or not session_state.get("is_active"):
-        return "00:00"
+        return -1
     
-    elapsed = int(time.time() - start_time)
-    return format_time(elapsed)
+    return time.time() - start_time
+
+
+# Client-side timer: re-anchors on each elapsed sync and ticks locally, so the
+# server is only contacted when the interview state actually changes
+TIMER_JS = """
+(elapsed) => {
+    clearInterval(window.__interviewTimer);
+    const el = document.getElementById("interview-timer");
+    if (!el) return [];
+    const active = elapsed !== null && elapsed >= 0;
+    const origin = Date.now() - (active ? elapsed * 1000 : 0);
+    const render = () => {
+        const secs = active ? Math.floor((Date.now() - origin) / 1000) : 0;
+        const mins = String(Math.floor(secs / 60)).padStart(2, "0");
+        el.textContent = `${mins}:${String(secs % 60).padStart(2, "0")}`;
+    };
+    render();
+    if (active) window.__interviewTimer = setInterval(render, 1000);
+    return [];
+}
+"""
 
 
 # ==================== Gradio UI ====================
@@ -753,10 +868,11 @@ def create_app():
                         gr.Markdown("### 🎛️ Controls")
                         
                         # Timer
-                        timer_display = gr.Markdown(
-                            "**⏱️ Duration:** 00:00",
+                        timer_display = gr.HTML(
+                            '<b>⏱️ Duration:</b> <span id="interview-timer">00:00</span>',
                             elem_classes=["timer-display"]
                         )
+                        timer_elapsed = gr.Number(value=-1, visible=False)
                         
                         # Control buttons
                         with gr.Row():
@@ -912,7 +1028,7 @@ def create_app():
         )
         
         # Start interview
-        start_btn.click(
+        start_event = start_btn.click(
             fn=start_interview,
             inputs=[session_state],
             outputs=[status_display, chatbot, audio_output, session_state, start_btn, end_btn],
@@ -920,7 +1036,7 @@ def create_app():
         )
         
         # Send audio response (button click)
-        send_audio_btn.click(
+        send_audio_event = send_audio_btn.click(
             fn=process_audio_response,
             inputs=[audio_input, session_state],
             outputs=[status_display, chatbot, audio_output, transcription_box, session_state, start_btn, end_btn],
@@ -933,7 +1049,7 @@ def create_app():
         )
         
         # Auto-process when recording stops
-        audio_input.stop_recording(
+        stop_recording_event = audio_input.stop_recording(
             fn=process_audio_response,
             inputs=[audio_input, session_state],
             outputs=[status_display, chatbot, audio_output, transcription_box, session_state, start_btn, end_btn],
@@ -946,7 +1062,7 @@ def create_app():
         )
         
         # Send text response
-        send_text_btn.click(
+        send_text_event = send_text_btn.click(
             fn=process_text_response,
             inputs=[text_input, session_state],
             outputs=[status_display, chatbot, audio_output, session_state, start_btn, end_btn],
@@ -959,13 +1075,17 @@ def create_app():
         )
         
         # End interview
-        end_btn.click(
+        end_event = end_btn.click(
             fn=end_interview,
             inputs=[session_state],
             outputs=[status_display, session_state, start_btn, end_btn],
             api_name=False
         )
         
+        timer_sync_events = [
+            start_event, send_audio_event, stop_recording_event, send_text_event, end_event
+        ]
+        
         # View results
         view_results_btn.click(
             fn=get_evaluation_results,
@@ -974,13 +1094,19 @@ def create_app():
             api_name=False
         )
         
-        # Timer update (every 1 second when active)
-        timer_update = gr.Timer(1)
-        timer_update.tick(
-            fn=lambda s: f"**⏱️ Duration:** {get_timer_display(s)}",
-            inputs=[session_state],
-            outputs=[timer_display],
-            api_name=False
+        # Timer runs in the browser; re-sync it only when interview state changes
+        for event in timer_sync_events:
+            event.then(
+                fn=get_timer_elapsed,
+                inputs=[session_state],
+                outputs=[timer_elapsed],
+                api_name=False
+            )
+        timer_elapsed.change(
+            fn=None,
+            inputs=[timer_elapsed],
+            outputs=None,
+            js=TIMER_JS
         )
     
     return app
@@ -990,7 +1116,7 @@ def create_app():
 
 # Ensure directories exist
 os.makedirs("uploads", exist_ok=True)
-os.makedirs("voice_outputs", exist_ok=True)
+os.makedirs(settings.audio_output_dir, exist_ok=True)
 
 # Create app at module level for HF Spaces
 demo = create_app()
@@ -1,15 +1,17 @@
 import os
 import sys
 import uuid
-import shutil
+import hashlib
+import asyncio
 from typing import Optional, List
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
+import aiofiles
 import uvicorn
 
 # Add project root to path
@@ -17,9 +19,20 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from utils.config import settings
 from utils.logger import get_logger
-from utils.tts import synthesize as tts_synthesize, list_english_voices
-from utils.stt import transcribe as stt_transcribe, preload_deepgram
+from utils.tts import (
+    synthesize_stream as tts_synthesize_stream,
+    synthesize as tts_synthesize,
+    list_english_voices
+)
+from utils.stt import (
+    transcribe as stt_transcribe,
+    transcribe_stream as stt_transcribe_stream,
+    preload_deepgram,
+    preload_whisper_model,
+    warm_deepgram_connection
+)
 from db.database import get_db, init_db, close_db
+from RAG_engine.retriever import get_embedding_model
 from services import interview_service
 
 logger = get_logger(__name__)
@@ -91,10 +104,21 @@ async def lifespan(app: FastAPI):
     
     # Ensure directories exist
     os.makedirs(settings.upload_dir, exist_ok=True)
-    os.makedirs("voice_outputs", exist_ok=True)
+    os.makedirs(settings.audio_output_dir, exist_ok=True)
     
-    # Initialize Deepgram client
+    # Initialize Deepgram client, and the local Whisper fallback if installed
     preload_deepgram()
+    await asyncio.gather(
+        warm_deepgram_connection(),
+        asyncio.to_thread(preload_whisper_model)
+    )
+    
+    # Build the shared embedding client now rather than on the first session
+    try:
+        await asyncio.to_thread(get_embedding_model)
+        logger.info("Embedding model ready")
+    except Exception as e:
+        logger.warning(f"Failed to initialize embedding model: {e}")
     
     logger.info(f"Server ready at http://{settings.host}:{settings.port}")
     
@@ -164,46 +188,77 @@ async def get_voices():
 
 # ==================== Document Upload Endpoints ====================
 
-@app.post("/upload/jd")
-async def upload_jd(file: UploadFile = File(...)):
-    if not file.filename.endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files are supported")
-    
-    file_id = str(uuid.uuid4())
-    file_path = os.path.join(settings.upload_dir, f"jd_{file_id}.pdf")
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+async def save_upload(file: UploadFile, prefix: str) -> str:
+    """Stream an uploaded PDF to disk without blocking the event loop.
+    The PDF signature is checked before anything is written, and the size cap
+    is enforced while streaming. Files are named by content hash, so a repeat
+    upload reuses the existing file and the vectorstores built from it.
+    Returns the stored file's path."""
+    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+    if not chunk.startswith(b"%PDF-"):
+        raise HTTPException(status_code=400, detail=f"{file.filename} is not a valid PDF")
     
+    max_bytes = settings.max_upload_size_mb * 1024 * 1024
+    written = 0
+    digest = hashlib.blake2b(digest_size=16)
+    tmp_path = os.path.join(settings.upload_dir, f"{prefix}_{uuid.uuid4().hex}.part")
     try:
-        os.makedirs(settings.upload_dir, exist_ok=True)
-        with open(file_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
+        async with aiofiles.open(tmp_path, "wb") as f:
+            while chunk:
+                written += len(chunk)
+                if written > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"{file.filename} exceeds {settings.max_upload_size_mb} MB"
+                    )
+                digest.update(chunk)
+                await f.write(chunk)
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
         
-        logger.info(f"JD uploaded: {file_path}")
-        return {"file_id": file_id, "file_path": file_path, "filename": file.filename}
-    except Exception as e:
-        logger.error(f"Error uploading JD: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        file_path = os.path.join(settings.upload_dir, f"{prefix}_{digest.hexdigest()}.pdf")
+        if os.path.exists(file_path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, file_path)
+        return file_path
+    except BaseException:
+        # Don't leave a partial upload behind
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 
-@app.post("/upload/resume")
-async def upload_resume(file: UploadFile = File(...)):
+async def _handle_pdf_upload(file: UploadFile, prefix: str, label: str) -> dict:
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
-    file_id = str(uuid.uuid4())
-    file_path = os.path.join(settings.upload_dir, f"resume_{file_id}.pdf")
-    
     try:
         os.makedirs(settings.upload_dir, exist_ok=True)
-        with open(file_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
+        file_path = await save_upload(file, prefix)
+        file_id = os.path.splitext(os.path.basename(file_path))[0].removeprefix(f"{prefix}_")
         
-        logger.info(f"Resume uploaded: {file_path}")
+        logger.info(f"{label} uploaded: {file_path}")
         return {"file_id": file_id, "file_path": file_path, "filename": file.filename}
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error uploading resume: {e}")
+        logger.error(f"Error uploading {label}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/upload/jd")
+async def upload_jd(file: UploadFile = File(...)):
+    return await _handle_pdf_upload(file, "jd", "JD")
+
+
+@app.post("/upload/resume")
+async def upload_resume(file: UploadFile = File(...)):
+    return await _handle_pdf_upload(file, "resume", "Resume")
+
+
 # ==================== Session Management Endpoints ====================
 
 @app.post("/session/create", response_model=SessionResponse)
@@ -307,6 +362,7 @@ async def chat(
 async def chat_with_audio(
     session_id: str = Form(...),
     message: str = Form(...),
+    audio: bool = True,
     db: AsyncSession = Depends(get_db)
 ):
     success, response, is_complete = await interview_service.send_message(
@@ -316,15 +372,20 @@ async def chat_with_audio(
     if not success:
         raise HTTPException(status_code=400, detail=response)
     
+    # Text-only callers skip synthesis, the slowest step of the turn
+    if not audio:
+        return {
+            "response": response,
+            "is_complete": is_complete,
+            "audio_url": None
+        }
+    
     try:
         # Generate audio
         audio_bytes = await tts_synthesize(response)
         
         # Save audio file
-        audio_id = str(uuid.uuid4())
-        audio_path = f"voice_outputs/{audio_id}.mp3"
-        with open(audio_path, "wb") as f:
-            f.write(audio_bytes)
+        audio_id = await save_tts_audio(audio_bytes)
         
         return {
             "response": response,
@@ -372,29 +433,107 @@ async def transcribe_audio(audio: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.websocket("/ws/stt")
+async def stream_transcription(websocket: WebSocket):
+    """Binary frames in, finalized transcript segments out as they are
+    recognized. The client sends the text message "done" when the answer ends."""
+    await websocket.accept()
+    disconnected = False
+    
+    async def audio_frames():
+        nonlocal disconnected
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                disconnected = True
+                return
+            if message.get("text") == "done":
+                return
+            if message.get("bytes"):
+                yield message["bytes"]
+    
+    segments = []
+    try:
+        async for segment in stt_transcribe_stream(audio_frames()):
+            segments.append(segment)
+            if not disconnected:
+                await websocket.send_json({"text": segment, "is_final": True})
+        if disconnected:
+            logger.info("STT stream client disconnected")
+            return
+        await websocket.send_json({"text": " ".join(segments), "done": True})
+    except WebSocketDisconnect:
+        logger.info("STT stream client disconnected")
+    except Exception as e:
+        logger.error(f"Streaming transcription error: {e}")
+        if not disconnected:
+            try:
+                await websocket.close(code=1011)
+            except RuntimeError:
+                # The client went away while the error was being handled
+                pass
+
+
 @app.post("/tts/synthesize")
 async def synthesize_speech(request: TTSRequest):
+    if not request.text or not request.text.strip():
+        raise HTTPException(status_code=400, detail="Text cannot be empty")
+    
+    # Pull the first chunk before committing to a 200: once streaming starts,
+    # an Edge/gTTS failure can no longer become an error response
+    stream = tts_synthesize_stream(request.text, voice=request.voice)
     try:
-        audio_bytes = await tts_synthesize(request.text, voice=request.voice)
-        
-        return StreamingResponse(
-            iter([audio_bytes]),
-            media_type="audio/mpeg",
-            headers={"Content-Disposition": "attachment; filename=speech.mp3"}
-        )
+        first_chunk = await anext(stream)
+    except StopAsyncIteration:
+        raise HTTPException(status_code=500, detail="TTS produced no audio")
     except Exception as e:
         logger.error(f"TTS error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    async def body():
+        yield first_chunk
+        async for chunk in stream:
+            yield chunk
+    
+    # Forward audio as it is synthesized instead of buffering the whole MP3
+    return StreamingResponse(
+        body(),
+        media_type="audio/mpeg",
+        headers={"Content-Disposition": "attachment; filename=speech.mp3"}
+    )
+
+
+async def save_tts_audio(audio_bytes: bytes) -> str:
+    """Write synthesized speech off the event loop and return its audio id"""
+    audio_id = str(uuid.uuid4())
+    audio_path = os.path.join(settings.audio_output_dir, f"{audio_id}.mp3")
+    async with aiofiles.open(audio_path, "wb") as f:
+        await f.write(audio_bytes)
+    return audio_id
+
+
+# Audio ids are fresh UUIDs, so a given URL always serves the same bytes
+AUDIO_CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
 
 
 @app.get("/audio/{audio_id}")
 async def get_audio(audio_id: str):
-    audio_path = f"voice_outputs/{audio_id}.mp3"
+    audio_path = os.path.join(settings.audio_output_dir, f"{audio_id}.mp3")
     
     if not os.path.exists(audio_path):
         raise HTTPException(status_code=404, detail="Audio not found")
     
-    return FileResponse(audio_path, media_type="audio/mpeg")
+    # Let nginx send the file from the kernel instead of streaming it through Python
+    if settings.audio_accel_redirect_prefix:
+        return Response(
+            media_type="audio/mpeg",
+            headers={
+                **AUDIO_CACHE_HEADERS,
+                "X-Accel-Redirect": f"{settings.audio_accel_redirect_prefix.rstrip('/')}/{audio_id}.mp3"
+            }
+        )
+    
+    return FileResponse(audio_path, media_type="audio/mpeg", headers=AUDIO_CACHE_HEADERS)
 
 
 # ==================== Voice Interview Endpoint ====================
@@ -403,6 +542,7 @@ async def get_audio(audio_id: str):
 async def voice_interview(
     session_id: str = Form(...),
     audio: UploadFile = File(...),
+    reply_audio: bool = True,
     db: AsyncSession = Depends(get_db)
 ):
     try:
@@ -430,14 +570,19 @@ async def voice_interview(
         
         logger.info(f"AI Response: {response[:100]}...")
         
+        if not reply_audio:
+            return {
+                "user_text": user_text,
+                "response": response,
+                "is_complete": is_complete,
+                "audio_url": None
+            }
+        
         # 3. Generate speech from response
         response_audio = await tts_synthesize(response)
         
         # Save audio
-        audio_id = str(uuid.uuid4())
-        audio_path = f"voice_outputs/{audio_id}.mp3"
-        with open(audio_path, "wb") as f:
-            f.write(response_audio)
+        audio_id = await save_tts_audio(response_audio)
         
         return {
             "user_text": user_text,
@@ -477,14 +622,10 @@ async def quick_start(
         # Save files
         os.makedirs(settings.upload_dir, exist_ok=True)
         
-        jd_path = os.path.join(settings.upload_dir, f"jd_{session_id}.pdf")
-        resume_path = os.path.join(settings.upload_dir, f"resume_{session_id}.pdf")
-        
-        with open(jd_path, "wb") as f:
-            shutil.copyfileobj(jd.file, f)
-        
-        with open(resume_path, "wb") as f:
-            shutil.copyfileobj(resume.file, f)
+        jd_path, resume_path = await asyncio.gather(
+            save_upload(jd, "jd"),
+            save_upload(resume, "resume")
+        )
         
         # Create session
         success, message = await interview_service.create_interview_session(
@@ -525,9 +666,16 @@ async def quick_start(
 # ==================== Run Server ====================
 
 if __name__ == "__main__":
+    workers = 1 if settings.debug else settings.web_concurrency
+    if workers > 1 and not settings.redis_url:
+        logger.warning("WEB_CONCURRENCY > 1 without REDIS_URL: workers will not share interview state")
+    
     uvicorn.run(
         "main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        workers=workers,
+        loop="uvloop",
+        http="httptools"
     )
@@ -1,18 +1,144 @@
 import os
+import asyncio
+import aiofiles
 from typing import Optional, Dict, Any, Tuple
+from cachetools import TTLCache
 from sqlalchemy.ext.asyncio import AsyncSession
 from langchain_core.messages import HumanMessage, AIMessage
 
 from db import crud
 from db.models import SessionStatus, MessageRole
 from src.orchastrate import InterviewSession as WorkflowSession
+from utils.config import settings
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 # In-memory cache for active workflow sessions
-# This stores the LangGraph workflow state that can't be serialized to DB
-_workflow_cache: Dict[str, WorkflowSession] = {}
+# This stores the LangGraph workflow state that can't be serialized to DB.
+# Idle sessions expire and are rebuilt from their snapshot on the next request.
+_workflow_cache: Dict[str, WorkflowSession] = TTLCache(
+    maxsize=settings.workflow_cache_max,
+    ttl=settings.workflow_cache_ttl
+)
+
+# Per-session locks so concurrent requests don't restore the same workflow twice
+_restore_locks: Dict[str, asyncio.Lock] = {}
+
+# Conversation snapshots, so a restored session resumes without replaying the
+# transcript through the LLM. Redis when REDIS_URL is set (shared between
+# workers), otherwise one JSON file per session under settings.snapshot_dir.
+_redis_client = None
+SNAPSHOT_TTL_SECONDS = 24 * 60 * 60
+
+
+def _get_redis():
+    global _redis_client
+    
+    if _redis_client is None and settings.redis_url:
+        import redis.asyncio as redis
+        _redis_client = redis.from_url(settings.redis_url)
+        logger.info("Redis state store initialized")
+    
+    return _redis_client
+
+
+def _snapshot_path(session_id: str) -> str:
+    return os.path.join(settings.snapshot_dir, f"{session_id}.json")
+
+
+async def _save_snapshot(session_id: str, workflow: WorkflowSession):
+    snapshot = workflow.export_state()
+    try:
+        client = _get_redis()
+        if client is not None:
+            # The message count is stored beside the snapshot so other workers can
+            # tell whether their cached state is behind without fetching the history
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.set(f"workflow:{session_id}", snapshot, ex=SNAPSHOT_TTL_SECONDS)
+                pipe.set(f"workflow:{session_id}:version", workflow.message_count, ex=SNAPSHOT_TTL_SECONDS)
+                await pipe.execute()
+            return
+        
+        # Write then rename so a crash never leaves a truncated snapshot behind
+        os.makedirs(settings.snapshot_dir, exist_ok=True)
+        path = _snapshot_path(session_id)
+        async with aiofiles.open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            await f.write(snapshot)
+        os.replace(f"{path}.tmp", path)
+    except Exception as e:
+        logger.warning(f"Failed to save workflow snapshot for {session_id}: {e}")
+
+
+async def _load_snapshot(session_id: str) -> Optional[str]:
+    try:
+        client = _get_redis()
+        if client is not None:
+            snapshot = await client.get(f"workflow:{session_id}")
+            return snapshot.decode() if isinstance(snapshot, bytes) else snapshot
+        
+        async with aiofiles.open(_snapshot_path(session_id), "r", encoding="utf-8") as f:
+            return await f.read()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Failed to load workflow snapshot for {session_id}: {e}")
+        return None
+
+
+async def _snapshot_version(session_id: str) -> int:
+    """Message count of the shared snapshot, 0 if there is none"""
+    try:
+        version = await _get_redis().get(f"workflow:{session_id}:version")
+        return int(version) if version else 0
+    except Exception as e:
+        logger.warning(f"Failed to read snapshot version for {session_id}: {e}")
+        return 0
+
+
+async def _delete_snapshot(session_id: str):
+    try:
+        client = _get_redis()
+        if client is not None:
+            await client.delete(f"workflow:{session_id}", f"workflow:{session_id}:version")
+        else:
+            os.remove(_snapshot_path(session_id))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Failed to delete workflow snapshot for {session_id}: {e}")
+
+
+async def _get_workflow(db: AsyncSession, session_id: str) -> Optional[WorkflowSession]:
+    """Return the session's workflow with up-to-date conversation state.
+    Another worker may have advanced the conversation, so a newer shared
+    snapshot replaces the locally cached state."""
+    workflow = _workflow_cache.get(session_id)
+    if not workflow:
+        # Concurrent requests for an uncached session share a single restore
+        lock = _restore_locks.setdefault(session_id, asyncio.Lock())
+        try:
+            async with lock:
+                workflow = _workflow_cache.get(session_id)
+                if not workflow:
+                    # Try to restore from DB
+                    restored = await _restore_workflow(db, session_id)
+                    workflow = _workflow_cache.get(session_id) if restored else None
+        finally:
+            # Waiters already hold a reference. Drop the entry whether or not the
+            # restore worked, so unknown session ids can't pile up locks.
+            if _restore_locks.get(session_id) is lock:
+                del _restore_locks[session_id]
+        return workflow
+    
+    # TTLCache ages entries from insertion; re-insert so active sessions stay cached
+    _workflow_cache[session_id] = workflow
+    
+    if settings.redis_url and await _snapshot_version(session_id) > workflow.message_count:
+        snapshot = await _load_snapshot(session_id)
+        if snapshot:
+            workflow.load_state(snapshot)
+    return workflow
 
 
 async def create_interview_session(
@@ -32,20 +158,6 @@ async def create_interview_session(
         if not os.path.exists(resume_path):
             return False, f"Resume file not found: {resume_path}"
         
-        # Create DB session record
-        db_session = await crud.create_session(
-            db=db,
-            session_id=session_id,
-            company_name=company_name,
-            position=position,
-            mode=mode,
-            num_questions=num_questions,
-            num_followup=num_followup,
-            jd_path=jd_path,
-            resume_path=resume_path
-        )
-        
-        # Initialize workflow
         workflow = WorkflowSession(
             jd_path=jd_path,
             resume_path=resume_path,
@@ -55,7 +167,22 @@ async def create_interview_session(
             num_of_q=num_questions,
             num_of_follow_up=num_followup
         )
-        workflow.setup()
+        
+        # The DB record and the document indexing don't depend on each other
+        await asyncio.gather(
+            crud.create_session(
+                db=db,
+                session_id=session_id,
+                company_name=company_name,
+                position=position,
+                mode=mode,
+                num_questions=num_questions,
+                num_followup=num_followup,
+                jd_path=jd_path,
+                resume_path=resume_path
+            ),
+            asyncio.to_thread(workflow.setup)
+        )
         
         # Cache the workflow
         _workflow_cache[session_id] = workflow
@@ -73,16 +200,13 @@ async def start_interview(
     session_id: str
 ) -> Tuple[bool, str]:
     try:
-        workflow = _workflow_cache.get(session_id)
+        workflow = await _get_workflow(db, session_id)
         if not workflow:
-            # Try to restore from DB
-            restored = await _restore_workflow(db, session_id)
-            if not restored:
-                return False, "Session not found"
-            workflow = _workflow_cache[session_id]
+            return False, "Session not found"
         
         # Start interview
-        response = workflow.start_interview("Hi")
+        response = await workflow.astart_interview("Hi")
+        await _save_snapshot(session_id, workflow)
         
         # Update DB status
         await crud.update_session_status(db, session_id, SessionStatus.IN_PROGRESS)
@@ -104,16 +228,13 @@ async def send_message(
     message: str
 ) -> Tuple[bool, str, bool]:
     try:
-        workflow = _workflow_cache.get(session_id)
+        workflow = await _get_workflow(db, session_id)
         if not workflow:
-            restored = await _restore_workflow(db, session_id)
-            if not restored:
-                return False, "Session not found", False
-            workflow = _workflow_cache[session_id]
+            return False, "Session not found", False
         
         # Get AI response
-        response = workflow.send_message(message)
-        is_complete = workflow.is_interview_complete()
+        response, is_complete = await workflow.asend_message_with_status(message)
+        await _save_snapshot(session_id, workflow)
         
         # Save messages to DB
         await crud.add_message(db, session_id, MessageRole.HUMAN, message)
@@ -183,6 +304,7 @@ async def delete_interview_session(
     # Remove from cache
     if session_id in _workflow_cache:
         del _workflow_cache[session_id]
+    await _delete_snapshot(session_id)
     
     # Delete from DB
     return await crud.delete_session(db, session_id)
@@ -207,6 +329,23 @@ async def list_sessions(
     ]
 
 
+def _replay_workflow(workflow: WorkflowSession, messages) -> None:
+    """Set up a recreated workflow and replay stored human messages into it"""
+    workflow.setup()
+    
+    # Replay messages to restore state
+    if messages:
+        # Start with first exchange
+        first_human = next((m for m in messages if m.role == MessageRole.HUMAN), None)
+        if first_human:
+            workflow.start_interview(first_human.content)
+        
+        # Replay remaining human messages
+        for msg in messages:
+            if msg.role == MessageRole.HUMAN and msg != first_human:
+                workflow.send_message(msg.content)
+
+
 async def _restore_workflow(
     db: AsyncSession,
     session_id: str
@@ -230,19 +369,15 @@ async def _restore_workflow(
             num_of_q=session.num_questions,
             num_of_follow_up=session.num_followup
         )
-        workflow.setup()
-        
-        # Replay messages to restore state
-        if session.messages:
-            # Start with first exchange
-            first_human = next((m for m in session.messages if m.role == MessageRole.HUMAN), None)
-            if first_human:
-                workflow.start_interview(first_human.content)
-            
-            # Replay remaining human messages
-            for msg in session.messages:
-                if msg.role == MessageRole.HUMAN and msg != first_human:
-                    workflow.send_message(msg.content)
+        snapshot = await _load_snapshot(session_id)
+        if snapshot:
+            # Adopt the saved conversation instead of replaying it through the LLM
+            await asyncio.to_thread(workflow.setup)
+            workflow.load_state(snapshot)
+        else:
+            # Sessions without a snapshot predate snapshotting; rebuild by replay.
+            # Setup and replay are LLM round-trips; keep them off the event loop
+            await asyncio.to_thread(_replay_workflow, workflow, session.messages)
         
         _workflow_cache[session_id] = workflow
         logger.info(f"Restored workflow for session: {session_id}")
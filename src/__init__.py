@@ -1,6 +1,6 @@
 from src.llm import get_llm, get_default_llm, get_eval_llm
 from src.prompts import interviewer_prompt, evaluator_prompt, report_writer_prompt
-from src.tools import create_jd_tool, create_resume_tool, save_report_as_pdf, report_writer_tools
+from src.tools import create_jd_tool, create_resume_tool, create_combined_tool, save_report_as_pdf, report_writer_tools
 from src.agents import (
     AgentState,
     create_recruiter_agent,
@@ -32,6 +32,7 @@ __all__ = [
     # Tools
     "create_jd_tool",
     "create_resume_tool",
+    "create_combined_tool",
     "save_report_as_pdf",
     "report_writer_tools",
     # Agents
@@ -1,13 +1,17 @@
+from functools import lru_cache
 from typing import TypedDict, Annotated, List
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.prebuilt import ToolNode, tools_condition
 from langgraph.graph.message import add_messages
 from operator import add
 
 from src.prompts import interviewer_prompt, evaluator_prompt, report_writer_prompt
-from src.llm import get_default_llm, get_eval_llm
+from src.phrases import is_interview_ended
+from src.llm import get_default_llm, get_eval_llm, get_report_base_llm, uses_prompt_cache_control
 from src.tools import create_jd_tool, create_resume_tool, save_report_as_pdf, report_writer_tools
+from utils.config import settings
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -25,60 +29,144 @@ class AgentState(TypedDict):
     messages: Annotated[list, add_messages]
 
 
+# ===================== HISTORY WINDOW =====================
+# Older turns are recapped in the system prompt; candidate answers more briefly
+_RECAP_LIMITS = {AIMessage: ("You", 200), HumanMessage: ("Candidate", 120)}
+
+
+def _trim_history(messages: List, window: int):
+    """Keep roughly the last `window` messages and recap the turns before them."""
+    if window <= 0 or len(messages) <= window:
+        return messages, ""
+    
+    # Open the window on a candidate turn: Gemini rejects a history whose first
+    # non-system message isn't from the user, and it also never starts on tool
+    # results whose tool call was trimmed. If no candidate turn falls inside the
+    # window, reach back to the last one before it.
+    cut = len(messages) - window
+    human_turns = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+    start = next((i for i in human_turns if i >= cut), human_turns[-1] if human_turns else cut)
+    
+    earlier_turns = []
+    for m in messages[:start]:
+        label, limit = _RECAP_LIMITS.get(type(m), (None, 0))
+        if label and m.content:
+            earlier_turns.append(f"- {label}: {str(m.content)[:limit]}")
+    return messages[start:], '\n'.join(earlier_turns)
+
+
+# ===================== SYSTEM PROMPTS =====================
+# Session parameters are fixed for the life of an interview, so the system
+# prompts can be formatted once. A byte-identical prefix every turn also lets
+# providers reuse their prompt cache.
+def _interviewer_system_prompt(params) -> str:
+    return interviewer_prompt.format(
+        mode=params['mode'],
+        company_name=params['company_name'],
+        position=params['position'],
+        number_of_questions=params['num_of_q'],
+        number_of_follow_up=params['num_of_follow_up']
+    )
+
+
+def _evaluator_system_prompt(params) -> str:
+    return evaluator_prompt.format(
+        num_of_q=params['num_of_q'],
+        num_of_follow_up=params['num_of_follow_up'],
+        position=params['position']
+    )
+
+
 # ===================== RECRUITER AGENT =====================
-def create_recruiter_agent(tools: List):
+def _recruiter_system_message(prompt: str, earlier_turns: str = "") -> SystemMessage:
+    """Keep the fixed interviewer prompt as the leading, byte-stable part of the
+    system message; providers that need it get an explicit cache breakpoint."""
+    recap = (
+        "\nEARLIER IN THIS INTERVIEW (older turns omitted):\n" + earlier_turns
+        if earlier_turns else ""
+    )
+    
+    if uses_prompt_cache_control(get_default_llm()):
+        blocks = [{"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}]
+        if recap:
+            blocks.append({"type": "text", "text": recap})
+        return SystemMessage(content=blocks)
+    
+    return SystemMessage(content=prompt + recap)
+
+
+def create_recruiter_agent(tools: List, static_params: dict = None):
+    static_prompt = _interviewer_system_prompt(static_params) if static_params else None
+    # Built once; runs multiple tool calls from one reply concurrently
+    tool_node = ToolNode(tools)
+    
+    # Bound on first use rather than here so a missing API key still surfaces on the first turn
+    @lru_cache(maxsize=1)
+    def bound_llm():
+        return get_default_llm().bind_tools(tools)
+    
+    @lru_cache(maxsize=1)
+    def static_msg():
+        return _recruiter_system_message(static_prompt)
+    
+    def prompt_messages(state: AgentState) -> list:
+        # Bound per-turn input tokens: older turns are replaced by a compact recap
+        history, earlier_turns = _trim_history(state['messages'], settings.history_window)
+        
+        if static_prompt and not earlier_turns:
+            sys_prompt = static_msg()
+        else:
+            sys_prompt = _recruiter_system_message(
+                static_prompt or _interviewer_system_prompt(state), earlier_turns
+            )
+        
+        return [sys_prompt] + history
     
     def recruiter(state: AgentState) -> AgentState:
         """The recruiter agent conducts interviews using the interviewer prompt and tools."""
-        sys_prompt = SystemMessage(content=interviewer_prompt.format(
-            mode=state['mode'],
-            company_name=state['company_name'],
-            position=state['position'],
-            number_of_questions=state['num_of_q'],
-            number_of_follow_up=state['num_of_follow_up']
-        ))
-        all_messages = [sys_prompt] + list(state['messages'])
-        llm = get_default_llm()
-        result = llm.bind_tools(tools).invoke(all_messages)
+        all_messages = prompt_messages(state)
+        result = bound_llm().invoke(all_messages)
         
         # If the model made tool calls, execute tools and get a clean response
         if hasattr(result, 'tool_calls') and result.tool_calls:
-            tool_node = ToolNode(tools)
             tool_results = tool_node.invoke({"messages": [result]})
             
-            updated_messages = all_messages + [result] + tool_results['messages']
-            final_result = llm.bind_tools(tools).invoke(updated_messages)
+            updated_messages = [*all_messages, result, *tool_results['messages']]
+            final_result = bound_llm().invoke(updated_messages)
+            return {"messages": [result] + tool_results['messages'] + [final_result]}
+        
+        return {"messages": [result]}
+    
+    async def arecruiter(state: AgentState) -> AgentState:
+        """Async twin of recruiter, used when the graph runs via ainvoke/astream.
+        The JD and resume lookups from one reply are awaited together."""
+        all_messages = prompt_messages(state)
+        result = await bound_llm().ainvoke(all_messages)
+        
+        if hasattr(result, 'tool_calls') and result.tool_calls:
+            tool_results = await tool_node.ainvoke({"messages": [result]})
+            
+            updated_messages = [*all_messages, result, *tool_results['messages']]
+            final_result = await bound_llm().ainvoke(updated_messages)
             return {"messages": [result] + tool_results['messages'] + [final_result]}
         
         return {"messages": [result]}
     
-    return recruiter
+    # The graph picks recruiter for invoke() and arecruiter for ainvoke()
+    return RunnableLambda(recruiter, afunc=arecruiter, name="recruiter")
 
 
 # ===================== EVALUATOR AGENT =====================
-def create_evaluator_agent(jd_tool):
+def create_evaluator_agent(jd_tool, static_params: dict = None):
+    static_msg = SystemMessage(content=_evaluator_system_prompt(static_params)) if static_params else None
+    
+    @lru_cache(maxsize=1)
+    def bound_evallm():
+        return get_eval_llm().bind_tools([jd_tool])
     
     def evaluator(state: AgentState) -> AgentState:
         """The evaluator agent assesses candidate responses using the evaluator prompt."""
-        sys_prompt = evaluator_prompt.format(
-            num_of_q=state['num_of_q'],
-            num_of_follow_up=state['num_of_follow_up'],
-            position=state['position']
-        )
-        sys_msg = SystemMessage(content=sys_prompt)
-        
-        # Build interview transcript
-        interview_base = []
-        for msg in state['messages']:
-            if isinstance(msg, HumanMessage):
-                interview_base.append('Candidate: ' + str(msg.content))
-            elif isinstance(msg, AIMessage):
-                interview_base.append('Interviewer: ' + str(msg.content))
-        
-        all_messages = [sys_msg, HumanMessage(content='\n'.join(interview_base))]
-        evallm = get_eval_llm()
-        evallm_with_tools = evallm.bind_tools([jd_tool])
-        results = evallm_with_tools.invoke(all_messages)
+        results = bound_evallm().invoke(evaluator_input(state, static_msg))
         
         return {
             'messages': [AIMessage(content=results.content)], 
@@ -88,63 +176,65 @@ def create_evaluator_agent(jd_tool):
     return evaluator
 
 
+def evaluator_input(state: AgentState, sys_msg: SystemMessage = None) -> list:
+    """Messages for one evaluator call; also used by the offline batch runner."""
+    sys_msg = sys_msg or SystemMessage(content=_evaluator_system_prompt(state))
+    transcript = _render_transcript(state['messages'], 'Interviewer')
+    return [sys_msg, HumanMessage(content=transcript)]
+
+
 # ===================== REPORT WRITER AGENT =====================
-def report_writer(state: AgentState) -> AgentState:
-    """Generates a report based on the interview transcript and evaluation."""
-    interviewer_transcript = []
-    for m in state["messages"]:
-        if isinstance(m, HumanMessage):
-            interviewer_transcript.append('Candidate: ' + str(m.content))
-        elif isinstance(m, AIMessage):
-            # Exclude evaluation results from transcript
-            if 'Evaluation:\n1. Introduction question' not in m.content:
-                interviewer_transcript.append('AI Recruiter: ' + str(m.content))
-    
-    # Get evaluation report
-    evaluation_report = [
-        m.content for m in state["messages"] 
-        if isinstance(m, AIMessage) and 'Evaluation:\n1. Introduction question' in m.content
-    ]
+# Opening of the evaluator's output, used to tell it apart from interview turns
+EVALUATION_MARKER = 'Evaluation:\n1. Introduction question'
+
+
+@lru_cache(maxsize=1)
+def get_report_llm():
+    return get_report_base_llm().bind_tools(report_writer_tools)
+
+
+def _render_transcript(messages: list, ai_label: str, evaluation: str = '') -> str:
+    """Candidate/AI transcript, leaving out the evaluator's own output."""
+    # Exact-type lookup; state messages are never subclasses of these two
+    roles = {HumanMessage: 'Candidate', AIMessage: ai_label}
+    lines = []
+    for m in messages:
+        role = roles.get(type(m))
+        if role is None:
+            continue
+        if type(m) is AIMessage:
+            if evaluation and m.content == evaluation:
+                continue
+            if not evaluation and EVALUATION_MARKER in m.content:
+                continue
+        lines.append(f'{role}: {m.content}')
+    return '\n'.join(lines)
+
+
+def report_writer_input(state: AgentState) -> list:
+    """Messages for one report writer call; also used by the offline batch runner."""
+    # The evaluator already stored its output in state, so there is no need
+    # to search the messages for it; that output is only skipped in the transcript
+    evaluation_report = state.get('evaluation_result', '')
     
     sys_prompt = report_writer_prompt.format(
         position=state['position'],
         company_name=state['company_name'],
-        interview_transcript='\n'.join(interviewer_transcript),
-        evaluation_report='\n'.join(evaluation_report) if evaluation_report else state.get('evaluation_result', '')
+        interview_transcript=_render_transcript(state['messages'], 'AI Recruiter', evaluation_report),
+        evaluation_report=evaluation_report
     )
     sys_message = SystemMessage(content=sys_prompt)
-    all_messages = [sys_message, HumanMessage(content='Generate the report now.')]
-    llm = get_default_llm()
-    result = llm.bind_tools(report_writer_tools).invoke(all_messages)
+    return [sys_message, HumanMessage(content='Generate the report now.')]
+
+
+def report_writer(state: AgentState) -> AgentState:
+    """Generates a report based on the interview transcript and evaluation."""
+    result = get_report_llm().invoke(report_writer_input(state))
     
     return {"messages": [result], "hr_report": result.content}
 
 
 # ===================== CONDITIONAL EDGES =====================
-# Phrases that indicate the interview has ended
-END_PHRASES = [
-    "that's it for today",
-    "thank you for your time",
-    "thank you for joining", 
-    "this concludes",
-    "end of the interview",
-    "interview is complete",
-    "we're done",
-    "that concludes",
-    "we'll be in touch",
-    "best of luck",
-    "good luck",
-    "great talking with you",
-    "enjoyed learning about",
-    "enjoyed our conversation"
-]
-
-def is_interview_ended(content: str) -> bool:
-    """Check if the message indicates the interview has ended."""
-    content_lower = content.lower()
-    return any(phrase in content_lower for phrase in END_PHRASES)
-
-
 def custom_tools_condition(state: AgentState) -> str:
     """Decides the next step based on the last message."""
     last_message = state['messages'][-1] if state['messages'] else None
@@ -162,13 +252,20 @@ def custom_tools_condition(state: AgentState) -> str:
 
 
 # ===================== WORKFLOW BUILDER =====================
-def build_interview_workflow(jd_tool, resume_tool):
+def build_interview_workflow(jd_tool, resume_tool, static_params: dict = None, checkpointer=None,
+                             combined_tool=None):
+    """static_params holds the per-session mode, company_name, position,
+    num_of_q and num_of_follow_up so system prompts are formatted once.
+    With a checkpointer, each turn only needs to pass the new message.
+    combined_tool searches both documents in one call."""
     
     tools = [jd_tool, resume_tool]
+    if combined_tool is not None:
+        tools.append(combined_tool)
     
     # Create agents
-    recruiter = create_recruiter_agent(tools)
-    evaluator = create_evaluator_agent(jd_tool)
+    recruiter = create_recruiter_agent(tools, static_params)
+    evaluator = create_evaluator_agent(jd_tool, static_params)
     
     # Define the graph
     workflow = StateGraph(AgentState)
@@ -221,7 +318,7 @@ def build_interview_workflow(jd_tool, resume_tool):
     workflow.add_edge("report_writer_tools", END)
     
     # Compile
-    app = workflow.compile()
+    app = workflow.compile(checkpointer=checkpointer)
     logger.info("Interview workflow compiled successfully.")
     
     return app
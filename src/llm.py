@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from utils.config import settings
 from utils.logger import get_logger
 
@@ -8,31 +10,79 @@ _ChatOpenAI = None
 _ChatGroq = None
 _ChatGoogleGenerativeAI = None
 
-def _import_llm_classes():
-    """Lazy import LLM classes only when needed"""
-    global _ChatOpenAI, _ChatGroq, _ChatGoogleGenerativeAI
-    if _ChatOpenAI is None:
-        from langchain_openai import ChatOpenAI as CO
-        _ChatOpenAI = CO
+# One importer per provider, so only the one that is actually used pays
+# for its SDK and transitive dependencies
+def _import_groq():
+    global _ChatGroq
     if _ChatGroq is None:
         from langchain_groq import ChatGroq as CG
         _ChatGroq = CG
+    return _ChatGroq
+
+def _import_google():
+    global _ChatGoogleGenerativeAI
     if _ChatGoogleGenerativeAI is None:
         from langchain_google_genai import ChatGoogleGenerativeAI as CGG
         _ChatGoogleGenerativeAI = CGG
+    return _ChatGoogleGenerativeAI
+
+def _import_openai():
+    global _ChatOpenAI
+    if _ChatOpenAI is None:
+        from langchain_openai import ChatOpenAI as CO
+        _ChatOpenAI = CO
+    return _ChatOpenAI
 
 
-def get_llm(temperature: float = 0.6):
-    """Get LLM instance with fallback chain"""
-    _import_llm_classes()
+LLM_CACHE_MAX_ENTRIES = 1024
+
+@lru_cache(maxsize=1)
+def _get_response_cache():
+    """Response cache for the deterministic-leaning evaluator/report models, so
+    identical prompts (e.g. an evaluation retried on the same transcript) skip
+    the provider round-trip. Never installed globally: the recruiter must keep
+    sampling fresh replies for every candidate."""
+    backend = settings.llm_cache.lower()
+    if backend in ("", "none", "off"):
+        return None
+    try:
+        if backend == "sqlite":
+            from langchain_community.cache import SQLiteCache
+            cache = SQLiteCache(database_path=settings.llm_cache_path)
+        else:
+            from langchain_core.caches import InMemoryCache
+            cache = InMemoryCache(maxsize=LLM_CACHE_MAX_ENTRIES)
+        logger.info(f"LLM response cache enabled for evaluator/report ({backend})")
+        return cache
+    except Exception as e:
+        logger.warning(f"LLM response cache unavailable: {e}")
+        return None
+
+
+@lru_cache(maxsize=1)
+def _get_http_client():
+    """One keep-alive connection pool for every OpenAI-compatible and Groq client"""
+    import httpx
+    return httpx.Client(
+        timeout=60.0,
+        limits=httpx.Limits(max_keepalive_connections=10, max_connections=32)
+    )
+
+
+def get_llm(temperature: float = 0.6, cached: bool = False):
+    """Get LLM instance with fallback chain; cached=True attaches the response cache"""
+    # cache=None leaves the model uncached (no global cache is ever set)
+    cache = _get_response_cache() if cached else None
     
     # Primary: Groq
     if settings.groq_api_key:
         try:
-            llm_instance = _ChatGroq(
+            llm_instance = _import_groq()(
                 model_name=settings.groq_model,
                 api_key=settings.groq_api_key,
-                temperature=temperature
+                temperature=temperature,
+                http_client=_get_http_client(),
+                cache=cache
             )
             logger.info(f"Initialized LLM via Groq: {settings.groq_model}")
             return llm_instance
@@ -42,10 +92,11 @@ def get_llm(temperature: float = 0.6):
     # Fallback: Google
     if settings.google_api_key:
         try:
-            llm_instance = _ChatGoogleGenerativeAI(
+            llm_instance = _import_google()(
                 model=settings.google_model,
                 google_api_key=settings.google_api_key,
-                temperature=temperature
+                temperature=temperature,
+                cache=cache
             )
             logger.info(f"Initialized LLM via Google: {settings.google_model}")
             return llm_instance
@@ -55,11 +106,13 @@ def get_llm(temperature: float = 0.6):
     # Fallback: OpenRouter
     if settings.openrouter_api_key:
         try:
-            llm_instance = _ChatOpenAI(
+            llm_instance = _import_openai()(
                 model=settings.openrouter_model,
                 api_key=settings.openrouter_api_key,
                 base_url=settings.openrouter_base_url,
-                temperature=temperature
+                temperature=temperature,
+                http_client=_get_http_client(),
+                cache=cache
             )
             logger.info(f"Initialized LLM via OpenRouter: {settings.openrouter_model}")
             return llm_instance
@@ -69,20 +122,30 @@ def get_llm(temperature: float = 0.6):
     raise RuntimeError("No LLM could be initialized. Check your API keys.")
 
 
-# Lazy LLM instances - initialized on first access
-_llm = None
-_evallm = None
+def uses_prompt_cache_control(llm) -> bool:
+    """Anthropic models behind OpenRouter only reuse a prompt prefix when it is
+    marked with cache_control; Groq and OpenAI-style providers cache automatically"""
+    return (
+        _ChatOpenAI is not None
+        and isinstance(llm, _ChatOpenAI)
+        and str(getattr(llm, "model_name", "")).startswith("anthropic/")
+    )
+
+
+# Lazy LLM instances - one per temperature, shared by every session
+@lru_cache(maxsize=16)
+def get_llm_cached(temperature: float = 0.6, cached: bool = False):
+    """Get a pooled LLM instance for this temperature; use cache_clear() to reset"""
+    return get_llm(temperature=temperature, cached=cached)
 
 def get_default_llm():
     """Get default LLM with lazy initialization"""
-    global _llm
-    if _llm is None:
-        _llm = get_llm()
-    return _llm
+    return get_llm_cached(0.6)
 
 def get_eval_llm():
     """Get evaluator LLM with lazy initialization"""
-    global _evallm
-    if _evallm is None:
-        _evallm = get_llm(temperature=0.3)
-    return _evallm
+    return get_llm_cached(0.3, cached=True)
+
+def get_report_base_llm():
+    """Report writer LLM: same temperature as the recruiter, but with responses cached"""
+    return get_llm_cached(0.6, cached=True)
@@ -1,21 +1,71 @@
 import os
+import re
 import sys
+import json
+import uuid
+import asyncio
 
 # Add project root to path for module imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import Optional
-from langchain_core.messages import HumanMessage, AIMessage
+from typing import Iterator, List, Optional, Tuple
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, messages_from_dict, messages_to_dict
 
-from RAG_engine.indexer import load_jd_and_resume, split_documents
-from RAG_engine.retriever import create_vectorstores, get_retrievers, load_existing_vectorstore
-from src.tools import create_jd_tool, create_resume_tool
-from src.agents import AgentState, build_interview_workflow
+from RAG_engine.indexer import load_document, split_document
+from RAG_engine.retriever import create_vectorstore, get_retrievers, load_existing_vectorstore
+from src.tools import (
+    create_jd_tool, create_resume_tool, create_combined_tool, render_report_pdf, save_report_as_pdf
+)
+from src.agents import (
+    AgentState, build_interview_workflow, evaluator_input, report_writer_input, get_report_llm
+)
+from src.phrases import is_completion_message, is_farewell_message
+from src.llm import get_default_llm, get_eval_llm
 from utils.config import settings
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Speaker labels by exact message type, for transcript rendering
+_TRANSCRIPT_ROLES = {HumanMessage: "Candidate", AIMessage: "Recruiter"}
+
+
+DEFAULT_PERSIST_DIR = "./chroma_db"
+
+# Upper bound on provider requests in flight per stage of run_batch_async
+BATCH_MAX_CONCURRENCY = 8
+
+# Batch PDFs are named "<session_id or interview_N>_<requested name>"
+DEFAULT_REPORT_FILENAME = "HR_Interview_Report.pdf"
+_UNSAFE_FILENAME_RE = re.compile(r"[^\w.-]+")
+
+
+def _warm_llm(getter):
+    try:
+        getter()
+    except Exception as e:
+        # The first turn will retry and surface the error
+        logger.warning(f"LLM warm-up failed: {e}")
+
+
+def _load_or_create_store(path: str, label: str, persist_dir: str, force_reindex: bool = False):
+    """Load one document's vectorstore, or parse, split and embed it."""
+    # Collection name is based on the file name
+    collection = os.path.splitext(os.path.basename(path))[0].replace(" ", "-")
+    
+    if not force_reindex and os.path.exists(f"{persist_dir}/{collection}"):
+        logger.info(f"Loading existing {label} vectorstore...")
+        return load_existing_vectorstore(collection, persist_dir)
+    
+    logger.info(f"Loading and indexing {label}...")
+    chunks = split_document(load_document(path))
+    logger.info(f"{label} split into {len(chunks)} chunks")
+    return create_vectorstore(chunks, collection, persist_dir=persist_dir, label=label)
+
+
 class InterviewSession:
 
     def __init__(
@@ -27,7 +77,7 @@ class InterviewSession:
         mode: str = None,
         num_of_q: int = None,
         num_of_follow_up: int = None,
-        persist_dir: str = "./chroma_db"
+        persist_dir: str = DEFAULT_PERSIST_DIR
     ):
         self.jd_path = jd_path
         self.resume_path = resume_path
@@ -42,7 +92,8 @@ class InterviewSession:
         self.jd_tool = None
         self.resume_tool = None
         self.app = None
-        self.current_state = None
+        self._initial_state = None
+        self._thread_config = None
         
     def setup(self, force_reindex: bool = False):
   
@@ -54,32 +105,31 @@ class InterviewSession:
         if not os.path.exists(self.resume_path):
             raise FileNotFoundError(f"Resume not found: {self.resume_path}")
         
-        # Define collection names based on file names
-        jd_collection = os.path.splitext(os.path.basename(self.jd_path))[0].replace(" ", "-")
-        resume_collection = os.path.splitext(os.path.basename(self.resume_path))[0].replace(" ", "-")
-        
-        # Check if vectorstores already exist
-        jd_store_path = f"{self.persist_dir}/{jd_collection}"
-        resume_store_path = f"{self.persist_dir}/{resume_collection}"
-        
-        if not force_reindex and os.path.exists(jd_store_path) and os.path.exists(resume_store_path):
-            logger.info("Loading existing vectorstores...")
-            jd_store = load_existing_vectorstore(jd_collection, self.persist_dir)
-            resume_store = load_existing_vectorstore(resume_collection, self.persist_dir)
-        else:
-            # Load and split documents
-            logger.info("Loading and processing documents...")
-            pages, resume = load_jd_and_resume(self.jd_path, self.resume_path)
-            jd_chunks, resume_chunks = split_documents(pages, resume)
-            
-            # Create vectorstores
-            logger.info("Creating vectorstores...")
-            jd_store, resume_store = create_vectorstores(
-                jd_chunks, resume_chunks,
-                jd_collection=jd_collection,
-                resume_collection=resume_collection,
-                persist_dir=self.persist_dir
+        # LLM clients are independent of indexing; build them in the background
+        # so the first turn doesn't pay for the provider fallback chain
+        llm_warmup = ThreadPoolExecutor(max_workers=2)
+        for getter in (get_default_llm, get_eval_llm):
+            llm_warmup.submit(_warm_llm, getter)
+        
+        try:
+            self._build_workflow(force_reindex)
+        finally:
+            llm_warmup.shutdown(wait=True)
+        
+        logger.info("Interview session setup complete.")
+        return self
+    
+    def _build_workflow(self, force_reindex: bool):
+        # The JD and resume pipelines are independent end to end, so run them
+        # side by side; only a missing store is rebuilt
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            jd_future = executor.submit(
+                _load_or_create_store, self.jd_path, "JD", self.persist_dir, force_reindex
+            )
+            resume_future = executor.submit(
+                _load_or_create_store, self.resume_path, "resume", self.persist_dir, force_reindex
             )
+            jd_store, resume_store = jd_future.result(), resume_future.result()
         
         # Create retrievers
         jd_retriever, resume_retriever = get_retrievers(jd_store, resume_store)
@@ -87,12 +137,20 @@ class InterviewSession:
         # Create tools
         self.jd_tool = create_jd_tool(jd_retriever)
         self.resume_tool = create_resume_tool(resume_retriever)
+        combined_tool = create_combined_tool(jd_retriever, resume_retriever)
         
         # Build workflow
-        self.app = build_interview_workflow(self.jd_tool, self.resume_tool)
+        self.app = build_interview_workflow(self.jd_tool, self.resume_tool, {
+            "mode": self.mode,
+            "company_name": self.company_name,
+            "position": self.position,
+            "num_of_q": self.num_of_q,
+            "num_of_follow_up": self.num_of_follow_up
+        }, checkpointer=MemorySaver(), combined_tool=combined_tool)
+        self._new_thread()
         
-        # Initialize state
-        self.current_state = {
+        # Initial state for a new thread; after that the checkpointer owns it
+        self._initial_state = {
             "mode": self.mode,
             "num_of_q": self.num_of_q,
             "num_of_follow_up": self.num_of_follow_up,
@@ -102,125 +160,202 @@ class InterviewSession:
             "evaluation_result": "",
             "hr_report": ""
         }
-        
-        logger.info("Interview session setup complete.")
-        return self
     
     def start_interview(self, initial_message: str = "Hi") -> str:
         if not self.app:
             raise RuntimeError("Session not set up. Call setup() first.")
         
-        self.current_state["messages"] = [HumanMessage(content=initial_message)]
-        result = self.app.invoke(self.current_state)
-        self.current_state = result
+        self._new_thread()
+        result = self.app.invoke(self._start_input(initial_message), self._thread_config)
+        return self._reply_text(result)
+    
+    async def astart_interview(self, initial_message: str = "Hi") -> str:
+        """Async start_interview; runs the graph on the caller's event loop."""
+        if not self.app:
+            raise RuntimeError("Session not set up. Call setup() first.")
         
-        last_msg = result["messages"][-1]
-        if isinstance(last_msg, AIMessage):
-            return last_msg.content
-        return str(last_msg)
+        self._new_thread()
+        result = await self.app.ainvoke(self._start_input(initial_message), self._thread_config)
+        return self._reply_text(result)
     
     def send_message(self, message: str) -> str:
         if not self.app:
             raise RuntimeError("Session not set up. Call setup() first.")
         
-        # Add human message to current state
-        input_state = {
-            **self.current_state,
-            "messages": list(self.current_state["messages"]) + [HumanMessage(content=message)]
-        }
+        # The graph has already evaluated and reported; running it again would
+        # only repeat those LLM calls for input that can't change the outcome
+        if self.current_state.get("hr_report"):
+            logger.info("Interview already complete; not re-invoking the workflow")
+            return self.get_recruiter_farewell()
         
-        result = self.app.invoke(input_state)
-        self.current_state = result
+        result = self.app.invoke(self._input_state(message), self._thread_config)
+        return self._reply_text(result)
+    
+    async def asend_message(self, message: str) -> str:
+        """Async send_message; tool calls in one reply run concurrently."""
+        if not self.app:
+            raise RuntimeError("Session not set up. Call setup() first.")
         
+        if self.current_state.get("hr_report"):
+            logger.info("Interview already complete; not re-invoking the workflow")
+            return self.get_recruiter_farewell()
+        
+        result = await self.app.ainvoke(self._input_state(message), self._thread_config)
+        return self._reply_text(result)
+    
+    @staticmethod
+    def _reply_text(result: dict) -> str:
         last_msg = result["messages"][-1]
         if isinstance(last_msg, AIMessage):
             return last_msg.content
         return str(last_msg)
     
+    def _start_input(self, initial_message: str) -> dict:
+        return {**self._initial_state, "messages": [HumanMessage(content=initial_message)]}
+    
+    @property
+    def current_state(self) -> Optional[dict]:
+        """The latest checkpointed state, or the initial state before the first turn."""
+        if not self.app:
+            return None
+        return self.app.get_state(self._thread_config).values or self._initial_state
+    
+    def _new_thread(self):
+        """Point the session at a fresh, empty checkpointer thread."""
+        self._thread_config = {"configurable": {"thread_id": uuid.uuid4().hex}}
+    
+    def _input_state(self, message: str) -> dict:
+        # The checkpointer already holds the rest of the state, and the
+        # add_messages reducer appends the new message to it
+        if self.app.get_state(self._thread_config).values:
+            return {"messages": [HumanMessage(content=message)]}
+        
+        # Nothing checkpointed yet: seed the thread with the initial state
+        return self._start_input(message)
+    
+    def stream_message(self, message: str) -> Iterator[str]:
+        """Like send_message, but yield the recruiter's reply as tokens arrive.
+        The checkpointer records the new state once the graph finishes."""
+        if not self.app:
+            raise RuntimeError("Session not set up. Call setup() first.")
+        
+        if self.current_state.get("hr_report"):
+            yield self.get_recruiter_farewell()
+            return
+        
+        for chunk, metadata in self.app.stream(
+            self._input_state(message), self._thread_config, stream_mode="messages"
+        ):
+            # Only the recruiter's model tokens reach the candidate; the node also emits
+            # its ToolMessages (raw JD/resume text), and evaluator/report tokens are skipped
+            if (
+                metadata.get("langgraph_node") == "recruiter"
+                and isinstance(chunk, AIMessageChunk)
+                and isinstance(chunk.content, str)
+                and chunk.content
+            ):
+                yield chunk.content
+    
+    def send_message_with_status(self, message: str) -> Tuple[str, bool]:
+        """Send a message and report whether the interview finished on this turn."""
+        response = self.send_message(message)
+        return response, self.is_interview_complete()
+    
+    async def asend_message_with_status(self, message: str) -> Tuple[str, bool]:
+        response = await self.asend_message(message)
+        return response, self.is_interview_complete()
+    
     def is_interview_complete(self) -> bool:
-        if not self.current_state or not self.current_state.get("messages"):
+        state = self.current_state
+        if not state or not state.get("messages"):
             return False
         
         # Check if evaluation or HR report was generated (definitive completion)
-        if self.current_state.get("evaluation_result"):
+        if state.get("evaluation_result"):
             return True
-        if self.current_state.get("hr_report"):
+        if state.get("hr_report"):
             return True
         
-        # Check recent AI messages for end phrases (not just the very last)
-        messages = self.current_state["messages"]
-        end_phrases = [
-            "that's it for today",
-            "thank you for your time",
-            "thank you for joining",
-            "this concludes",
-            "end of the interview",
-            "interview is complete",
-            "we're done",
-            "that concludes",
-            "we'll be in touch",
-            "best of luck",
-            "good luck",
-            "great talking with you",
-            "enjoyed learning about",
-            "enjoyed our conversation",
-            "wraps up our interview",
-            "that's all for today",
-            "end of our session",
-            "take care"
-        ]
-        
         # Check last 5 AI messages (the farewell might not be the very last)
-        ai_messages = [m for m in messages if isinstance(m, AIMessage)]
-        for msg in ai_messages[-5:]:
-            content_lower = msg.content.lower()
-            if any(phrase in content_lower for phrase in end_phrases):
+        for msg in islice(self._recent_ai_messages(state), 5):
+            if is_completion_message(msg.content):
                 return True
         
         return False
     
+    @staticmethod
+    def _recent_ai_messages(state: dict):
+        """AI messages newest first, without scanning the whole transcript."""
+        return (m for m in reversed(state["messages"]) if type(m) is AIMessage)
+    
     def get_recruiter_farewell(self) -> str:
         """Get the recruiter's farewell message from the conversation."""
-        if not self.current_state or not self.current_state.get("messages"):
+        state = self.current_state
+        if not state or not state.get("messages"):
             return ""
         
-        end_phrases = [
-            "that's it for today", "thank you for your time",
-            "this concludes", "we'll be in touch", "best of luck",
-            "good luck", "great talking with you", "wraps up",
-            "take care", "enjoyed"
-        ]
-        
-        messages = self.current_state["messages"]
-        ai_messages = [m for m in messages if isinstance(m, AIMessage)]
-        
         # Search from the end backwards for the farewell message
-        for msg in reversed(ai_messages[-10:]):
-            content_lower = msg.content.lower()
-            if any(phrase in content_lower for phrase in end_phrases):
+        for msg in islice(self._recent_ai_messages(state), 10):
+            if is_farewell_message(msg.content):
                 return msg.content
         
         return ""
     
     def get_evaluation(self) -> Optional[str]:
-        return self.current_state.get("evaluation_result") if self.current_state else None
+        state = self.current_state
+        return state.get("evaluation_result") if state else None
     
     def get_hr_report(self) -> Optional[str]:
-        return self.current_state.get("hr_report") if self.current_state else None
+        state = self.current_state
+        return state.get("hr_report") if state else None
     
     def get_transcript(self) -> str:
-        if not self.current_state or not self.current_state.get("messages"):
+        state = self.current_state
+        if not state or not state.get("messages"):
             return ""
         
         transcript = []
-        for msg in self.current_state["messages"]:
-            if isinstance(msg, HumanMessage):
-                transcript.append(f"Candidate: {msg.content}")
-            elif isinstance(msg, AIMessage):
-                transcript.append(f"Recruiter: {msg.content}")
+        for msg in state["messages"]:
+            role = _TRANSCRIPT_ROLES.get(type(msg))
+            if role:
+                transcript.append(f"{role}: {msg.content}")
         
         return "\n\n".join(transcript)
 
+    
+    @property
+    def message_count(self) -> int:
+        """Length of the conversation; grows with every turn, so it doubles as a snapshot version."""
+        state = self.current_state
+        return len(state.get("messages") or []) if state else 0
+    
+    def export_state(self) -> str:
+        """Serialize the conversation state so another process can resume it."""
+        current = self.current_state
+        if not current:
+            return ""
+        
+        state = dict(current)
+        state["messages"] = messages_to_dict(state.get("messages", []))
+        return json.dumps(state)
+    
+    def load_state(self, snapshot: str):
+        """Replace the conversation state with one produced by export_state()."""
+        if not self.app:
+            raise RuntimeError("Session not set up. Call setup() first.")
+        
+        state = json.loads(snapshot)
+        state["messages"] = messages_from_dict(state.get("messages", []))
+        
+        # Seed a fresh thread so the reducers don't merge with stale checkpoints.
+        # Writing as the last node leaves the thread idle, like a finished turn.
+        previous_thread = self._thread_config["configurable"]["thread_id"]
+        self._new_thread()
+        self.app.update_state(self._thread_config, state, as_node="report_writer_tools")
+        
+        # The old thread's checkpoints hold a full copy of the history; free them
+        self.app.checkpointer.delete_thread(previous_thread)
+
 
 def run_interactive_interview(
     jd_path: str,
@@ -261,8 +396,10 @@ def run_interactive_interview(
             continue
         
         try:
-            response = session.send_message(user_input)
-            print(f"\nRecruiter: {response}\n")
+            print("\nRecruiter: ", end="", flush=True)
+            for token in session.stream_message(user_input):
+                print(token, end="", flush=True)
+            print("\n")
         except Exception as e:
             logger.error(f"Error during interview: {e}")
             print(f"Error: {e}")
@@ -283,6 +420,97 @@ def run_interactive_interview(
     return session.current_state
 
 
+def _batch_pdf_jobs(configs: List[dict], reports: List) -> List[Tuple[int, str, str]]:
+    """(config index, report content, filename) for every save_report_as_pdf
+    call in a batch. Models mostly keep the tool's example filename, so each
+    name is prefixed with its interview's session_id (or position) to keep
+    reports from overwriting each other."""
+    jobs = []
+    for i, (config, report) in enumerate(zip(configs, reports)):
+        prefix = _UNSAFE_FILENAME_RE.sub("_", str(config.get("session_id") or f"interview_{i + 1}"))
+        for call in report.tool_calls:
+            if call["name"] != save_report_as_pdf.name:
+                continue
+            args = call["args"]
+            requested = os.path.basename(args.get("filename") or DEFAULT_REPORT_FILENAME)
+            requested = _UNSAFE_FILENAME_RE.sub("_", requested)
+            if not requested.endswith(".pdf"):
+                requested += ".pdf"
+            jobs.append((i, args.get("report_content") or report.content, f"{prefix}_{requested}"))
+    return jobs
+
+
+async def run_batch_async(configs: List[dict]) -> List[dict]:
+    """Run the evaluator and report writer over many finished interviews at once.
+    
+    Each config holds the ``jd_path`` the interview used and the ``snapshot``
+    from InterviewSession.export_state(), plus an optional ``persist_dir`` and
+    ``session_id``. Returns one {"evaluation", "hr_report", "report_pdf"} dict
+    per config, in order; ``report_pdf`` is None when no PDF was requested.
+    """
+    states = []
+    for config in configs:
+        state = json.loads(config["snapshot"])
+        state["messages"] = messages_from_dict(state.get("messages", []))
+        states.append(state)
+    
+    # Interviews against the same JD share one vectorstore and retriever tool
+    groups = {}
+    for i, config in enumerate(configs):
+        key = (config["jd_path"], config.get("persist_dir", DEFAULT_PERSIST_DIR))
+        groups.setdefault(key, []).append(i)
+    
+    batch_config = {"max_concurrency": BATCH_MAX_CONCURRENCY}
+    evaluations = [""] * len(configs)
+    
+    async def evaluate_group(jd_path: str, persist_dir: str, indices: List[int]):
+        jd_store = await asyncio.to_thread(_load_or_create_store, jd_path, "JD", persist_dir)
+        jd_tool = create_jd_tool(jd_store.as_retriever(search_type="similarity"))
+        evallm = get_eval_llm().bind_tools([jd_tool])
+        results = await evallm.abatch([evaluator_input(states[i]) for i in indices], batch_config)
+        for i, result in zip(indices, results):
+            evaluations[i] = result.content
+    
+    await asyncio.gather(*(
+        evaluate_group(jd_path, persist_dir, indices)
+        for (jd_path, persist_dir), indices in groups.items()
+    ))
+    
+    # Same state update the evaluator node makes before the report writer runs
+    for state, evaluation in zip(states, evaluations):
+        state["messages"] = [*state["messages"], AIMessage(content=evaluation)]
+        state["evaluation_result"] = evaluation
+    
+    reports = await get_report_llm().abatch([report_writer_input(s) for s in states], batch_config)
+    
+    # Save the PDFs the model asked for, as the report_writer_tools node would.
+    # ReportLab layout is CPU-bound, so a batch renders on separate processes.
+    pdf_jobs = _batch_pdf_jobs(configs, reports)
+    if len(pdf_jobs) > 1:
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=min(len(pdf_jobs), os.cpu_count() or 1)) as pool:
+            await asyncio.gather(*(
+                loop.run_in_executor(pool, render_report_pdf, content, filename)
+                for _, content, filename in pdf_jobs
+            ))
+    elif pdf_jobs:
+        _, content, filename = pdf_jobs[0]
+        await asyncio.to_thread(render_report_pdf, content, filename)
+    
+    report_pdfs = {i: filename for i, _, filename in pdf_jobs}
+    
+    logger.info(f"Batch evaluated {len(configs)} interviews across {len(groups)} JDs")
+    return [
+        {"evaluation": evaluation, "hr_report": report.content, "report_pdf": report_pdfs.get(i)}
+        for i, (evaluation, report) in enumerate(zip(evaluations, reports))
+    ]
+
+
+def run_batch(configs: List[dict]) -> List[dict]:
+    """Blocking wrapper around run_batch_async for scripts."""
+    return asyncio.run(run_batch_async(configs))
+
+
 # For backward compatibility
 def generate_interview_response(query: str, jd_path: str, resume_path: str) -> str:
     
@@ -0,0 +1,66 @@
+"""
+End-of-interview phrase detection for the AI Interview System
+"""
+import re
+from typing import List
+
+
+# Phrases that indicate the interview has ended
+END_PHRASES = [
+    "that's it for today",
+    "thank you for your time",
+    "thank you for joining", 
+    "this concludes",
+    "end of the interview",
+    "interview is complete",
+    "we're done",
+    "that concludes",
+    "we'll be in touch",
+    "best of luck",
+    "good luck",
+    "great talking with you",
+    "enjoyed learning about",
+    "enjoyed our conversation"
+]
+
+# Looking back over recent turns for completion also accepts softer sign-offs
+COMPLETION_PHRASES = END_PHRASES + [
+    "wraps up our interview",
+    "that's all for today",
+    "end of our session",
+    "take care"
+]
+
+# Broad markers used to pick the recruiter's farewell out of the transcript
+FAREWELL_PHRASES = [
+    "that's it for today", "thank you for your time",
+    "this concludes", "we'll be in touch", "best of luck",
+    "good luck", "great talking with you", "wraps up",
+    "take care", "enjoyed"
+]
+
+
+def _compile_phrases(phrases: List[str]):
+    """One alternation scans the text once instead of once per phrase.
+    Matching ignores case, so callers don't need a lowercased copy."""
+    return re.compile('|'.join(map(re.escape, phrases)), re.IGNORECASE)
+
+
+_END_RE = _compile_phrases(END_PHRASES)
+_COMPLETION_RE = _compile_phrases(COMPLETION_PHRASES)
+_FAREWELL_RE = _compile_phrases(FAREWELL_PHRASES)
+
+
+def is_interview_ended(content: str) -> bool:
+    """Check if the message indicates the interview has ended."""
+    return _END_RE.search(content) is not None
+
+
+def is_completion_message(content: str) -> bool:
+    """Check if the message reads as the close of the interview."""
+    return _COMPLETION_RE.search(content) is not None
+
+
+def is_farewell_message(content: str) -> bool:
+    """Check if the message looks like the recruiter's farewell."""
+    return _FAREWELL_RE.search(content) is not None
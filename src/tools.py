@@ -1,20 +1,32 @@
 from langchain_core.tools.retriever import create_retriever_tool
-from langchain_core.tools import tool
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-from reportlab.lib.colors import HexColor, black, white
-from reportlab.lib.units import inch
+from langchain_core.tools import StructuredTool
+from langchain_core.vectorstores import VectorStoreRetriever
 from datetime import datetime
+from xml.sax.saxutils import escape
+from collections import namedtuple
+import re
+from functools import lru_cache
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
+from RAG_engine.retriever import SemanticCacheRetriever
+from utils.config import settings
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
 def create_jd_tool(jd_retriever):
+    # Interviewers ask near-identical questions of the JD; answer repeats from memory
+    if settings.retrieval_cache_size > 0 and isinstance(jd_retriever, VectorStoreRetriever):
+        jd_retriever = SemanticCacheRetriever(
+            retriever=jd_retriever,
+            threshold=settings.retrieval_cache_threshold,
+            max_entries=settings.retrieval_cache_size,
+            ttl=settings.retrieval_cache_ttl
+        )
+    
     try:
         qa_tool = create_retriever_tool(
             retriever=jd_retriever,
@@ -42,78 +54,131 @@ def create_resume_tool(resume_retriever):
         raise RuntimeError(f"Failed to create resume retriever tool: {e}")
 
 
+def _join_documents(docs) -> str:
+    return "\n\n".join(doc.page_content for doc in docs)
+
+
+def create_combined_tool(jd_retriever, resume_retriever):
+    """One tool that searches the interview document and the resume together,
+    so a question needing both costs one tool call with overlapping lookups."""
+    
+    def _format(jd_docs, resume_docs) -> str:
+        return (
+            f"Interview document:\n{_join_documents(jd_docs)}\n\n"
+            f"Candidate resume:\n{_join_documents(resume_docs)}"
+        )
+    
+    def retrieve_both(query: str) -> str:
+        """Search the interview document and the candidate's resume at the same time."""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            jd_future = executor.submit(jd_retriever.invoke, query)
+            resume_future = executor.submit(resume_retriever.invoke, query)
+            return _format(jd_future.result(), resume_future.result())
+    
+    async def aretrieve_both(query: str) -> str:
+        jd_docs, resume_docs = await asyncio.gather(
+            jd_retriever.ainvoke(query), resume_retriever.ainvoke(query)
+        )
+        return _format(jd_docs, resume_docs)
+    
+    try:
+        combined_tool = StructuredTool.from_function(
+            func=retrieve_both,
+            coroutine=aretrieve_both,
+            name="interview_and_resume_retriever",
+            description="Useful when a question needs both the interview document and the candidate's resume, e.g. tying a project from the resume to the role's requirements."
+        )
+        logger.info("Combined retriever tool created successfully.")
+        return combined_tool
+    except Exception as e:
+        logger.error(f"Error creating combined retriever tool: {e}")
+        raise RuntimeError(f"Failed to create combined retriever tool: {e}")
+
+
 # --- PDF Report Tool ---
-# Color scheme for reports
-PRIMARY_COLOR = HexColor("#1a365d")
-SECONDARY_COLOR = HexColor("#2b6cb0")
-ACCENT_COLOR = HexColor("#38a169")
-WARNING_COLOR = HexColor("#dd6b20")
-BORDER_COLOR = HexColor("#e2e8f0")
+# ReportLab is imported on the first report, not when the tools are loaded;
+# most processes that import this module never write a PDF.
 
+# Color scheme for reports (hex, converted when the styles are built)
+PRIMARY_COLOR = "#1a365d"
+SECONDARY_COLOR = "#2b6cb0"
+ACCENT_COLOR = "#38a169"
+WARNING_COLOR = "#dd6b20"
+BORDER_COLOR = "#e2e8f0"
+FOOTER_COLOR = "#718096"
 
-@tool
-def save_report_as_pdf(report_content: str, filename: str) -> str:
-    """
-    Saves the provided report content as a professionally styled PDF file.
+# Section keywords for styling
+SECTION_KEYWORDS = {
+    'overall suitability': '📊 Overall Suitability',
+    'strengths': '✅ Strengths',
+    'areas for development': '⚠️ Areas for Development',
+    'weaknesses': '⚠️ Areas for Development',
+    'technical skills': '💻 Key Technical Skills',
+    'problem-solving': '🧩 Problem-Solving Approach',
+    'communication': '💬 Communication Skills',
+    'experience': '📁 Relevant Experience',
+    'recommendations': '🎯 Recommendations',
+    'candidate summary': '👤 Candidate Summary',
+}
 
-    Args:
-        report_content (str): The full text content of the HR report.
-        filename (str): The desired name for the PDF file (e.g., "HR_Interview_Report.pdf").
-                        Do NOT include path, just the filename.
+# One scan per line instead of a substring test per keyword. When a line
+# holds several keywords, the earliest in SECTION_KEYWORDS still wins.
+_SECTION_RE = re.compile('|'.join(re.escape(k) for k in SECTION_KEYWORDS))
+_SECTION_PRIORITY = {keyword: i for i, keyword in enumerate(SECTION_KEYWORDS)}
+_POSITIVE_RE = re.compile(r'strength|excellent|strong|proficient|demonstrated')
+_NEGATIVE_RE = re.compile(r'improve|develop|weakness|gap|lacking')
 
-    Returns:
-        str: The full path to the saved PDF file if successful, otherwise an error message.
-    """
-    if not filename.endswith(".pdf"):
-        filename += ".pdf"
-    
-    safe_filename = os.path.basename(filename)
+_CHECK_PREFIX = "✓ "
+_TRIANGLE_PREFIX = "△ "
+_BULLET_PREFIX = "• "
 
-    try:
-        doc = SimpleDocTemplate(
-            safe_filename, 
-            pagesize=letter,
-            rightMargin=0.75*inch,
-            leftMargin=0.75*inch,
-            topMargin=0.75*inch,
-            bottomMargin=0.75*inch
-        )
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
+ReportStyles = namedtuple(
+    'ReportStyles',
+    'title subtitle section_header body highlight warning footer primary_color border_color'
+)
+
+
+@lru_cache(maxsize=1)
+def _report_styles() -> ReportStyles:
+    """Paragraph styles are never mutated, so every report shares one set."""
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+    from reportlab.lib.colors import HexColor, black, white
+    
+    styles = getSampleStyleSheet()
+    primary = HexColor(PRIMARY_COLOR)
+    
+    return ReportStyles(
+        title=ParagraphStyle(
             'CustomTitle',
             parent=styles['Title'],
             fontSize=28,
-            textColor=PRIMARY_COLOR,
+            textColor=primary,
             alignment=TA_CENTER,
             spaceAfter=6,
             fontName='Helvetica-Bold'
-        )
-        
-        subtitle_style = ParagraphStyle(
+        ),
+        subtitle=ParagraphStyle(
             'CustomSubtitle',
             parent=styles['Normal'],
             fontSize=12,
-            textColor=SECONDARY_COLOR,
+            textColor=HexColor(SECONDARY_COLOR),
             alignment=TA_CENTER,
             spaceAfter=20,
             fontName='Helvetica-Oblique'
-        )
-        
-        section_header_style = ParagraphStyle(
+        ),
+        section_header=ParagraphStyle(
             'SectionHeader',
             parent=styles['Heading2'],
             fontSize=14,
             textColor=white,
-            backColor=PRIMARY_COLOR,
+            backColor=primary,
             borderPadding=(8, 8, 8, 8),
             spaceBefore=16,
             spaceAfter=10,
             fontName='Helvetica-Bold'
-        )
-        
-        body_style = ParagraphStyle(
+        ),
+        body=ParagraphStyle(
             'CustomBody',
             parent=styles['Normal'],
             fontSize=11,
@@ -122,104 +187,106 @@ def save_report_as_pdf(report_content: str, filename: str) -> str:
             spaceAfter=8,
             leading=16,
             fontName='Helvetica'
-        )
-        
-        highlight_style = ParagraphStyle(
+        ),
+        highlight=ParagraphStyle(
             'Highlight',
             parent=styles['Normal'],
             fontSize=11,
-            textColor=ACCENT_COLOR,
+            textColor=HexColor(ACCENT_COLOR),
             spaceAfter=6,
             fontName='Helvetica-Bold',
             leftIndent=15
-        )
-        
-        warning_style = ParagraphStyle(
+        ),
+        warning=ParagraphStyle(
             'Warning',
             parent=styles['Normal'],
             fontSize=11,
-            textColor=WARNING_COLOR,
+            textColor=HexColor(WARNING_COLOR),
             spaceAfter=6,
             fontName='Helvetica-Bold',
             leftIndent=15
-        )
+        ),
+        footer=ParagraphStyle(
+            'Footer', parent=styles['Normal'], fontSize=9,
+            textColor=HexColor(FOOTER_COLOR), alignment=TA_CENTER
+        ),
+        primary_color=primary,
+        border_color=HexColor(BORDER_COLOR),
+    )
+
 
+def render_report_pdf(report_content: str, filename: str) -> str:
+    """Body of save_report_as_pdf. A plain top-level function, so it can also
+    run in a worker process when many reports are rendered at once."""
+    if not filename.endswith(".pdf"):
+        filename += ".pdf"
+    
+    safe_filename = os.path.basename(filename)
+
+    try:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
+        
+        doc = SimpleDocTemplate(
+            safe_filename, 
+            pagesize=letter,
+            rightMargin=0.75*inch,
+            leftMargin=0.75*inch,
+            topMargin=0.75*inch,
+            bottomMargin=0.75*inch
+        )
+        styles = _report_styles()
+        
         story = []
         
         # Header
-        story.append(Paragraph("📋 HR Interview Report", title_style))
-        story.append(Paragraph(
-            f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", 
-            subtitle_style
-        ))
+        story.append(Paragraph("📋 HR Interview Report", styles.title))
+        generated_at = datetime.now().strftime('%B %d, %Y at %I:%M %p')
+        story.append(Paragraph(f"Generated on {generated_at}", styles.subtitle))
         
         story.append(HRFlowable(
-            width="100%", thickness=2, color=PRIMARY_COLOR,
+            width="100%", thickness=2, color=styles.primary_color,
             spaceBefore=5, spaceAfter=20
         ))
 
-        # Section keywords for styling
-        section_keywords = {
-            'overall suitability': '📊 Overall Suitability',
-            'strengths': '✅ Strengths',
-            'areas for development': '⚠️ Areas for Development',
-            'weaknesses': '⚠️ Areas for Development',
-            'technical skills': '💻 Key Technical Skills',
-            'problem-solving': '🧩 Problem-Solving Approach',
-            'communication': '💬 Communication Skills',
-            'experience': '📁 Relevant Experience',
-            'recommendations': '🎯 Recommendations',
-            'candidate summary': '👤 Candidate Summary',
-        }
-
         # Process content
-        paragraphs = report_content.split('\n')
-        
-        for para_text in paragraphs:
-            para_stripped = para_text.strip()
-            if not para_stripped:
-                continue
-                
-            is_section = False
-            for keyword, emoji_title in section_keywords.items():
-                if keyword in para_stripped.lower() and (
-                    para_stripped.endswith(':') or len(para_stripped) < 60
-                ):
+        for para_stripped in filter(None, (ln.strip() for ln in report_content.splitlines())):
+            lower = para_stripped.lower()
+            
+            # Only short lines or lines ending in ':' can be section headers
+            if para_stripped.endswith(':') or len(para_stripped) < 60:
+                keywords = _SECTION_RE.findall(lower)
+                if keywords:
+                    keyword = min(keywords, key=_SECTION_PRIORITY.__getitem__)
                     story.append(Spacer(1, 10))
-                    story.append(Paragraph(emoji_title, section_header_style))
-                    is_section = True
-                    break
+                    story.append(Paragraph(SECTION_KEYWORDS[keyword], styles.section_header))
+                    continue
             
-            if not is_section:
-                if para_stripped.startswith(('-', '•', '*', '–')):
-                    clean_text = para_stripped.lstrip('-•*– ').strip()
-                    if any(word in para_stripped.lower() for word in 
-                           ['strength', 'excellent', 'strong', 'proficient', 'demonstrated']):
-                        story.append(Paragraph(f"✓ {clean_text}", highlight_style))
-                    elif any(word in para_stripped.lower() for word in 
-                             ['improve', 'develop', 'weakness', 'gap', 'lacking']):
-                        story.append(Paragraph(f"△ {clean_text}", warning_style))
-                    else:
-                        story.append(Paragraph(f"• {clean_text}", body_style))
+            if para_stripped.startswith(('-', '•', '*', '–')):
+                # Escaped once so stray '&' or '<' in LLM output can't break the markup parser
+                clean_text = escape(para_stripped.lstrip('-•*– ').strip())
+                if _POSITIVE_RE.search(lower):
+                    story.append(Paragraph(_CHECK_PREFIX + clean_text, styles.highlight))
+                elif _NEGATIVE_RE.search(lower):
+                    story.append(Paragraph(_TRIANGLE_PREFIX + clean_text, styles.warning))
                 else:
-                    story.append(Paragraph(para_stripped, body_style))
+                    story.append(Paragraph(_BULLET_PREFIX + clean_text, styles.body))
+            else:
+                story.append(Paragraph(escape(para_stripped), styles.body))
 
         # Footer
         story.append(Spacer(1, 30))
         story.append(HRFlowable(
-            width="100%", thickness=1, color=BORDER_COLOR,
+            width="100%", thickness=1, color=styles.border_color,
             spaceBefore=10, spaceAfter=10
         ))
-        
-        footer_style = ParagraphStyle(
-            'Footer', parent=styles['Normal'], fontSize=9,
-            textColor=HexColor("#718096"), alignment=TA_CENTER
-        )
+
         story.append(Paragraph(
             "This report was automatically generated by AI Interview Assistant", 
-            footer_style
+            styles.footer
         ))
-        story.append(Paragraph("Confidential - For HR Use Only", footer_style))
+        story.append(Paragraph("Confidential - For HR Use Only", styles.footer))
 
         doc.build(story)
         logger.info(f"Report saved to: {os.path.abspath(safe_filename)}")
@@ -229,5 +296,34 @@ def save_report_as_pdf(report_content: str, filename: str) -> str:
         return f"❌ Error saving report as PDF: {e}"
 
 
+def _save_report_as_pdf(report_content: str, filename: str) -> str:
+    """
+    Saves the provided report content as a professionally styled PDF file.
+
+    Args:
+        report_content (str): The full text content of the HR report.
+        filename (str): The desired name for the PDF file (e.g., "HR_Interview_Report.pdf").
+                        Do NOT include path, just the filename.
+
+    Returns:
+        str: The full path to the saved PDF file if successful, otherwise an error message.
+    """
+    return render_report_pdf(report_content, filename)
+
+
+async def _save_report_as_pdf_async(report_content: str, filename: str) -> str:
+    # doc.build() can hold the GIL for seconds; keep it off the event loop
+    return await asyncio.to_thread(render_report_pdf, report_content, filename)
+
+
+# One tool, two bodies: invoke() renders inline, ainvoke() (the graph under
+# ainvoke/astream) renders on a worker thread
+save_report_as_pdf = StructuredTool.from_function(
+    func=_save_report_as_pdf,
+    coroutine=_save_report_as_pdf_async,
+    name="save_report_as_pdf"
+)
+
+
 # Export tools for report writing
 report_writer_tools = [save_report_as_pdf]
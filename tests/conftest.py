@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Add project root to path for module imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+pytest.importorskip("reportlab")
+pytest.importorskip("langgraph")
+
+from langchain_core.messages import AIMessage
+
+from src.orchastrate import _batch_pdf_jobs
+from src.tools import render_report_pdf, save_report_as_pdf
+
+
+def _report(content, filename):
+    return AIMessage(content="", tool_calls=[{
+        "name": save_report_as_pdf.name,
+        "args": {"report_content": content, "filename": filename},
+        "id": f"call_{content}",
+    }])
+
+
+def test_same_requested_filename_renders_separate_pdfs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    configs = [{"session_id": "a1"}, {}]
+    reports = [_report("First candidate", "HR_Interview_Report.pdf"),
+               _report("Second candidate", "HR_Interview_Report.pdf")]
+    
+    jobs = _batch_pdf_jobs(configs, reports)
+    for _, content, filename in jobs:
+        render_report_pdf(content, filename)
+    
+    filenames = [filename for _, _, filename in jobs]
+    assert filenames == ["a1_HR_Interview_Report.pdf", "interview_2_HR_Interview_Report.pdf"]
+    assert all(os.path.getsize(tmp_path / name) > 0 for name in filenames)
+
+
+def test_missing_filename_falls_back_to_default():
+    report = AIMessage(content="", tool_calls=[{
+        "name": save_report_as_pdf.name, "args": {"report_content": "Body"}, "id": "call_1",
+    }])
+    
+    assert _batch_pdf_jobs([{}], [report]) == [(0, "Body", "interview_1_HR_Interview_Report.pdf")]
@@ -3,12 +3,13 @@ LangInterview - Utility module
 Contains configuration, logging, and audio utilities.
 """
 
-from utils.config import settings, Settings
+from utils.config import settings, Settings, get_settings
 from utils.logger import get_logger, setup_logger
 
 __all__ = [
     "settings",
     "Settings",
+    "get_settings",
     "get_logger",
     "setup_logger",
 ]
\ No newline at end of file
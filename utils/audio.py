@@ -1,5 +1,8 @@
 import io
 import os
+import shutil
+import asyncio
+import subprocess
 import tempfile
 import numpy as np
 import soundfile as sf
@@ -8,23 +11,44 @@ from pydub import AudioSegment
 from utils.logger import get_logger
 logger = get_logger(__name__)
 
-async def load_audio(audio_data: bytes):
+# Sample rate used when ffmpeg decodes compressed input (speech-friendly)
+DECODE_SAMPLE_RATE = 16000
+
+def _decode_audio(audio_data: bytes):
     # Try soundfile first 
     try:
         with io.BytesIO(audio_data) as buf:
-            data, sampling_rate = sf.read(buf)
+            data, sampling_rate = sf.read(buf, dtype="float32")
             return data, sampling_rate
     except:
         pass    
     
+    # Let ffmpeg decode, downmix and resample in one native pass
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg:
+        proc = subprocess.run(
+            [ffmpeg, "-hide_banner", "-loglevel", "error", "-threads", "0",
+             "-i", "pipe:0", "-ac", "1", "-ar", str(DECODE_SAMPLE_RATE),
+             "-f", "f32le", "pipe:1"],
+            input=audio_data,
+            capture_output=True
+        )
+        if proc.returncode == 0 and proc.stdout:
+            return np.frombuffer(proc.stdout, dtype=np.float32), DECODE_SAMPLE_RATE
+        logger.warning(f"ffmpeg decode failed: {proc.stderr.decode(errors='ignore').strip()}")
+    
     # Fallback to pydub 
     with io.BytesIO(audio_data) as buf:
         audio = AudioSegment.from_file(buf)
         samples = np.array(audio.get_array_of_samples(), dtype=np.float32)
-        samples = samples / (2 ** (audio.sample_width * 8 - 1))
+        samples *= 1.0 / (2 ** (audio.sample_width * 8 - 1))  # scale in place
         if audio.channels == 2:
             samples = samples.reshape((-1, 2)).mean(axis=1)
         return samples, audio.frame_rate
+
+async def load_audio(audio_data: bytes):
+    # Decoding is CPU-bound, keep it off the event loop
+    return await asyncio.to_thread(_decode_audio, audio_data)
     
 async def save_to_temp_wav(audio_data: bytes, format_hint: str = None) -> str:
     temp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
@@ -32,10 +56,34 @@ async def save_to_temp_wav(audio_data: bytes, format_hint: str = None) -> str:
     temp.close()
     
     samples, sampling_rate = await load_audio(audio_data)
-    sf.write(temp_path, samples, sampling_rate)
+    await asyncio.to_thread(sf.write, temp_path, samples, sampling_rate)
     return temp_path
 
+async def _ffmpeg_transcode(audio_data: bytes, output_format: str, extra_args: list = None):
+    # Pipe straight through ffmpeg so samples never land on the Python heap
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return None
+    
+    proc = await asyncio.create_subprocess_exec(
+        ffmpeg, "-hide_banner", "-loglevel", "error",
+        "-i", "pipe:0", *(extra_args or []), "-f", output_format, "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    out, err = await proc.communicate(audio_data)
+    if proc.returncode == 0:
+        return out
+    logger.warning(f"ffmpeg conversion failed: {err.decode(errors='ignore').strip()}")
+    return None
+
 async def convert_to_format(audio_data: bytes, output_format: str = "mp3") -> bytes:
+    out = await _ffmpeg_transcode(audio_data, output_format)
+    if out is not None:
+        return out
+    
+    # Fallback to pydub
     with io.BytesIO(audio_data) as buf:
         audio = AudioSegment.from_file(buf)
     
@@ -43,6 +91,33 @@ async def convert_to_format(audio_data: bytes, output_format: str = "mp3") -> by
     audio.export(out, format=output_format)
     return out.getvalue()
 
+# Below this size (about 10 s of 48 kHz 16-bit mono WAV) an ffmpeg process
+# start costs more than the smaller upload saves
+STT_COMPRESS_MIN_BYTES = 1024 * 1024
+
+# Leading bytes of containers that are already compressed
+_COMPRESSED_MAGIC = (b"ID3", b"\xff\xfb", b"\xff\xf3", b"\xff\xf2", b"OggS", b"fLaC", b"\x1aE\xdf\xa3")
+
+
+def _is_compressed_audio(audio_data: bytes) -> bool:
+    # MP4/M4A carry "ftyp" after a 4-byte box size
+    return bytes(audio_data[:4]).startswith(_COMPRESSED_MAGIC) or audio_data[4:8] == b"ftyp"
+
+
+async def compress_for_stt(audio_data: bytes) -> bytes:
+    # Short clips and already-compressed uploads go through untouched, so the
+    # recognizer hears the original audio and no ffmpeg process is started
+    if len(audio_data) < STT_COMPRESS_MIN_BYTES or _is_compressed_audio(audio_data):
+        return audio_data
+    
+    # 16 kHz mono 64 kbps is plenty for speech recognition and shrinks uploads
+    out = await _ffmpeg_transcode(
+        audio_data, "mp3", ["-ac", "1", "-ar", "16000", "-b:a", "64k"]
+    )
+    if out and len(out) < len(audio_data):
+        return out
+    return audio_data
+
 async def get_audio_duration(audio_data: bytes) -> float:
     try:
         with io.BytesIO(audio_data) as buf:
@@ -1,55 +1,97 @@
 import os
-from pydantic import BaseModel
+import functools
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
-load_dotenv()
 
 
-class Settings(BaseModel):
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, "true" if default else "false").lower() == "true"
+
+
+# Plain frozen dataclass: fields are read from the environment when the
+# instance is created, with no per-field validation, and the instance is hashable
+@dataclass(frozen=True, slots=True)
+class Settings:
     # PostgreSQL Database
-    db_host: str = os.getenv("DB_HOST", "localhost")
-    db_port: int = int(os.getenv("DB_PORT", "5432"))
-    db_name: str = os.getenv("DB_NAME", "Interview_AI")
-    db_user: str = os.getenv("DB_USER", "postgres")
-    db_password: str = os.getenv("DB_PASSWORD", "020304")
+    db_host: str = field(default_factory=lambda: os.getenv("DB_HOST", "localhost"))
+    db_port: int = field(default_factory=lambda: _env_int("DB_PORT", 5432))
+    db_name: str = field(default_factory=lambda: os.getenv("DB_NAME", "Interview_AI"))
+    db_user: str = field(default_factory=lambda: os.getenv("DB_USER", "postgres"))
+    db_password: str = field(default_factory=lambda: os.getenv("DB_PASSWORD", "020304"))
     
     # LLM - OpenRouter (primary)
-    openrouter_api_key: str = os.getenv("OPENROUTER_API_KEY", "")
-    openrouter_model: str = os.getenv("OPENROUTER_MODEL", "upstage/solar-pro-3:free")
+    openrouter_api_key: str = field(default_factory=lambda: os.getenv("OPENROUTER_API_KEY", ""))
+    openrouter_model: str = field(default_factory=lambda: os.getenv("OPENROUTER_MODEL", "upstage/solar-pro-3:free"))
     openrouter_base_url: str = "https://openrouter.ai/api/v1"
     
     # Groq (fallback)
-    groq_api_key: str = os.getenv("GROQ_API_KEY", "")
-    groq_model: str = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+    groq_api_key: str = field(default_factory=lambda: os.getenv("GROQ_API_KEY", ""))
+    groq_model: str = field(default_factory=lambda: os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"))
     
     # Google (fallback)
-    google_api_key: str = os.getenv("GOOGLE_API_KEY", "")
-    google_model: str = os.getenv("GOOGLE_MODEL", "gemini-1.5-pro")
+    google_api_key: str = field(default_factory=lambda: os.getenv("GOOGLE_API_KEY", ""))
+    google_model: str = field(default_factory=lambda: os.getenv("GOOGLE_MODEL", "gemini-1.5-pro"))
+    
+    # LLM response cache: memory, sqlite or none
+    llm_cache: str = field(default_factory=lambda: os.getenv("LLM_CACHE", "memory"))
+    llm_cache_path: str = field(default_factory=lambda: os.getenv("LLM_CACHE_PATH", ".langchain.db"))
     
     # Server settings
-    host: str = os.getenv("HOST", "0.0.0.0")
-    port: int = int(os.getenv("PORT", "8000"))
-    debug: bool = os.getenv("DEBUG", "false").lower() == "true"
+    host: str = field(default_factory=lambda: os.getenv("HOST", "0.0.0.0"))
+    port: int = field(default_factory=lambda: _env_int("PORT", 8000))
+    debug: bool = field(default_factory=lambda: _env_bool("DEBUG", False))
+    web_concurrency: int = field(default_factory=lambda: _env_int("WEB_CONCURRENCY", 1))  # uvicorn worker processes
     
     # TTS settings (Edge TTS with gTTS fallback)
-    tts_voice: str = os.getenv("TTS_VOICE", "en-IN-NeerjaNeural")
-    tts_rate: str = os.getenv("TTS_RATE", "+0%")
-    tts_volume: str = os.getenv("TTS_VOLUME", "+0%")
+    tts_voice: str = field(default_factory=lambda: os.getenv("TTS_VOICE", "en-IN-NeerjaNeural"))
+    tts_rate: str = field(default_factory=lambda: os.getenv("TTS_RATE", "+0%"))
+    tts_volume: str = field(default_factory=lambda: os.getenv("TTS_VOLUME", "+0%"))
     
     # STT settings (Deepgram with Google fallback)
-    deepgram_api_key: str = os.getenv("DEEPGRAM_API_KEY", "")
-    stt_language: str = os.getenv("STT_LANGUAGE", "en")
+    deepgram_api_key: str = field(default_factory=lambda: os.getenv("DEEPGRAM_API_KEY", ""))
+    stt_language: str = field(default_factory=lambda: os.getenv("STT_LANGUAGE", "en"))
+    stt_whisper_model: str = field(default_factory=lambda: os.getenv("STT_WHISPER_MODEL", "base"))  # local faster-whisper fallback, if installed
+    stt_whisper_device: str = field(default_factory=lambda: os.getenv("STT_WHISPER_DEVICE", "auto"))
+    stt_whisper_compute_type: str = field(default_factory=lambda: os.getenv("STT_WHISPER_COMPUTE_TYPE", "auto"))  # auto = int8 on CPU
     
     # Audio settings
-    max_audio_duration_seconds: int = int(os.getenv("MAX_AUDIO_DURATION_SECONDS", "90"))
+    max_audio_duration_seconds: int = field(default_factory=lambda: _env_int("MAX_AUDIO_DURATION_SECONDS", 90))
+    audio_output_dir: str = field(default_factory=lambda: os.getenv("AUDIO_OUTPUT_DIR", "./voice_outputs"))  # point at tmpfs (e.g. /dev/shm) to skip disk
+    audio_accel_redirect_prefix: str = field(default_factory=lambda: os.getenv("AUDIO_ACCEL_REDIRECT_PREFIX", ""))  # nginx internal location serving audio_output_dir
     
     # Interview defaults
-    default_mode: str = os.getenv("DEFAULT_MODE", "friendly")
-    default_num_questions: int = int(os.getenv("DEFAULT_NUM_QUESTIONS", "3"))
-    default_num_followup: int = int(os.getenv("DEFAULT_NUM_FOLLOWUP", "2"))
+    default_mode: str = field(default_factory=lambda: os.getenv("DEFAULT_MODE", "friendly"))
+    default_num_questions: int = field(default_factory=lambda: _env_int("DEFAULT_NUM_QUESTIONS", 3))
+    default_num_followup: int = field(default_factory=lambda: _env_int("DEFAULT_NUM_FOLLOWUP", 2))
+    history_window: int = field(default_factory=lambda: _env_int("HISTORY_WINDOW", 24))  # messages sent to the recruiter LLM (0 = all)
     
-    # Upload settings
-    upload_dir: str = os.getenv("UPLOAD_DIR", "./uploads")
-    max_upload_size_mb: int = int(os.getenv("MAX_UPLOAD_SIZE_MB", "10"))
+    # Concurrency
+    max_concurrent_sessions: int = field(default_factory=lambda: _env_int("MAX_CONCURRENT_SESSIONS", 8))
+    redis_url: str = field(default_factory=lambda: os.getenv("REDIS_URL", ""))  # shared interview state across API workers
+    snapshot_dir: str = field(default_factory=lambda: os.getenv("SNAPSHOT_DIR", "./snapshots"))  # interview state snapshots when REDIS_URL is unset
+    workflow_cache_max: int = field(default_factory=lambda: _env_int("WORKFLOW_CACHE_MAX", 256))  # live sessions held in memory per worker
+    workflow_cache_ttl: int = field(default_factory=lambda: _env_int("WORKFLOW_CACHE_TTL", 1800))  # seconds an idle session stays cached
     
+    # Semantic cache in front of the JD retriever (size 0 disables it)
+    retrieval_cache_size: int = field(default_factory=lambda: _env_int("RETRIEVAL_CACHE_SIZE", 128))
+    retrieval_cache_threshold: float = field(default_factory=lambda: float(os.getenv("RETRIEVAL_CACHE_THRESHOLD", "0.92")))  # cosine similarity
+    retrieval_cache_ttl: int = field(default_factory=lambda: _env_int("RETRIEVAL_CACHE_TTL", 3600))  # seconds
     
-settings = Settings()
\ No newline at end of file
+    # Upload settings
+    upload_dir: str = field(default_factory=lambda: os.getenv("UPLOAD_DIR", "./uploads"))
+    max_upload_size_mb: int = field(default_factory=lambda: _env_int("MAX_UPLOAD_SIZE_MB", 10))
+
+
+
+@functools.cache
+def get_settings() -> Settings:
+    # .env is read here rather than at import, and only once per process
+    load_dotenv()
+    return Settings()
+
+
+settings = get_settings()
\ No newline at end of file
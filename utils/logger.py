@@ -1,11 +1,15 @@
+import functools
 import logging
 import sys
 
-_initialized = False
+_QUIET_LIBS = ("httpx", "httpcore", "whisper", "urllib3")
 
 def setup_logger(level=logging.INFO):
-    global _initialized
-    if _initialized:
+    # Applied even if Gradio/uvicorn configured root logging first
+    for lib in _QUIET_LIBS:
+        logging.getLogger(lib).setLevel(logging.WARNING)
+    
+    if logging.getLogger().handlers:
         return
     
     logging.basicConfig(
@@ -14,11 +18,8 @@ def setup_logger(level=logging.INFO):
         datefmt="%H:%M:%S",
         handlers=[logging.StreamHandler(sys.stdout)]
     )
-    for lib in ["httpx", "httpcore", "whisper", "urllib3"]:
-        logging.getLogger(lib).setLevel(logging.WARNING)
-        
-    _initialized = True
     
+@functools.lru_cache(maxsize=None)
 def get_logger(name):
     setup_logger()
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
@@ -1,88 +1,249 @@
+import io
 import os
+import math
 import asyncio
+import threading
+from typing import AsyncIterator
 
-from deepgram import DeepgramClient, AsyncDeepgramClient
+import numpy as np
+import soundfile as sf
 
 from utils.logger import get_logger
-from utils.audio import save_to_temp_wav, cleanup_temp_file
+from utils.audio import load_audio, compress_for_stt
 from utils.config import settings
 
 logger = get_logger(__name__)
 
 # Deepgram clients (initialized lazily)
-_deepgram_client = None
-_async_deepgram_client = None
+_deepgram_http = None
+
+DEEPGRAM_LISTEN_URL = "https://api.deepgram.com/v1/listen"
+DEEPGRAM_PROJECTS_URL = "https://api.deepgram.com/v1/projects"
 
 # Confidence threshold - below this, ask user to repeat
 CONFIDENCE_THRESHOLD = 0.4
 
+# Request options are identical for every call, so build them once
+_DEEPGRAM_PARAMS = {
+    "model": "nova-2",
+    "smart_format": "false",
+    "punctuate": "true",
+    "language": "en",
+}
 
-def _get_deepgram_client():
-    global _deepgram_client
-    
-    if _deepgram_client is None:
-        api_key = settings.deepgram_api_key
-        if not api_key:
-            raise ValueError("DEEPGRAM_API_KEY not configured")
-        _deepgram_client = DeepgramClient(api_key=api_key)
-        logger.info("Deepgram client initialized")
-    
-    return _deepgram_client
+# Google fallback recognizer (initialized lazily)
+_google_recognizer = None
+
+# Local faster-whisper model (loaded on first use; stays None if not installed)
+_whisper_model = None
+_whisper_lock = threading.Lock()
+_whisper_unavailable = False
 
 
-def _get_async_deepgram_client():
-    global _async_deepgram_client
+def _get_deepgram_http():
+    """One pooled keep-alive client for prerecorded requests. The SDK's async
+    client opens a fresh connection (and TLS handshake) per call; concurrent
+    utterances here share warm connections, multiplexed when h2 is installed."""
+    global _deepgram_http
     
-    if _async_deepgram_client is None:
+    if _deepgram_http is None:
         api_key = settings.deepgram_api_key
         if not api_key:
             raise ValueError("DEEPGRAM_API_KEY not configured")
-        _async_deepgram_client = AsyncDeepgramClient(api_key=api_key)
-        logger.info("Async Deepgram client initialized")
+        
+        import httpx
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        
+        _deepgram_http = httpx.AsyncClient(
+            headers={"Authorization": f"Token {api_key}"},
+            timeout=30.0,
+            http2=http2,
+            # Idle connections outlive the pause between two interview answers
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=16, keepalive_expiry=300)
+        )
+        logger.info(f"Deepgram HTTP client initialized (http2={http2})")
     
-    return _async_deepgram_client
+    return _deepgram_http
 
 
 async def transcribe_with_deepgram(audio_data: bytes) -> tuple:
-    client = _get_async_deepgram_client()
+    client = _get_deepgram_http()
     
-    from deepgram import PrerecordedOptions, FileSource
+    # httpx treats any non-bytes content as an iterable stream, so a bytearray
+    # (e.g. a short Gradio WAV buffer passed through uncompressed) is frozen first
+    if not isinstance(audio_data, bytes):
+        audio_data = bytes(audio_data)
     
-    payload: FileSource = {
-        "buffer": audio_data,
-    }
-    
-    options = PrerecordedOptions(
-        model="nova-2",
-        smart_format=False,
-        punctuate=True,
-        language="en",
+    response = await client.post(
+        DEEPGRAM_LISTEN_URL,
+        params=_DEEPGRAM_PARAMS,
+        content=audio_data,
+        headers={"Content-Type": "audio/*"}
     )
-    
-    response = await client.listen.rest.v("1").transcribe_file(payload, options)
+    response.raise_for_status()
     
     # Extract transcript and confidence
-    result = response.results.channels[0].alternatives[0]
-    text = result.transcript.strip()
-    confidence = result.confidence if hasattr(result, 'confidence') else 0.9
+    result = response.json()["results"]["channels"][0]["alternatives"][0]
+    text = result.get("transcript", "").strip()
+    confidence = result.get("confidence", 0.9)
     
     return text, confidence
 
 
-async def transcribe_with_google(audio_path: str) -> str:
+def _get_whisper_model():
+    global _whisper_model, _whisper_unavailable
+    
+    if _whisper_model is not None or _whisper_unavailable:
+        return _whisper_model
+    
+    with _whisper_lock:
+        if _whisper_model is None and not _whisper_unavailable:
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError:
+                _whisper_unavailable = True
+                logger.info("faster-whisper not installed; skipping local STT")
+                return None
+            
+            compute_type = settings.stt_whisper_compute_type
+            if compute_type == "auto" and settings.stt_whisper_device in ("auto", "cpu"):
+                compute_type = "int8"
+            _whisper_model = WhisperModel(
+                settings.stt_whisper_model,
+                device=settings.stt_whisper_device,
+                compute_type=compute_type,
+                cpu_threads=os.cpu_count() or 4
+            )
+            logger.info(f"faster-whisper model loaded ({settings.stt_whisper_model}, {compute_type})")
+    
+    return _whisper_model
+
+
+async def transcribe_with_whisper(audio_data: bytes) -> tuple:
+    def recognize():
+        model = _get_whisper_model()
+        if model is None:
+            return None, 0.0
+        
+        segments, _ = model.transcribe(
+            io.BytesIO(audio_data),
+            language=settings.stt_language,
+            vad_filter=True
+        )
+        segments = list(segments)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        if not segments:
+            return text, 0.0
+        
+        # Mean per-token log-probability mapped back to a 0-1 confidence
+        avg_logprob = sum(segment.avg_logprob for segment in segments) / len(segments)
+        return text, math.exp(avg_logprob)
+    
+    return await asyncio.to_thread(recognize)
+
+
+def _get_google_recognizer():
+    global _google_recognizer
+    
+    if _google_recognizer is None:
+        import speech_recognition as sr
+        _google_recognizer = sr.Recognizer()
+    
+    return _google_recognizer
+
+
+def _pcm16_audio_data(samples, sample_rate: int):
+    """Wrap 16-bit samples as sr.AudioData without going through sr.AudioFile,
+    which re-parses the WAV and copies it frame by frame."""
     import speech_recognition as sr
     
-    recognizer = sr.Recognizer()
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1).astype(np.int16)
+    return sr.AudioData(samples.tobytes(), sample_rate, 2)
+
+
+async def transcribe_samples_with_google(samples, sample_rate: int) -> str:
+    """Google STT on float samples already decoded by utils.audio.load_audio."""
+    recognizer = _get_google_recognizer()
     
     def recognize():
-        with sr.AudioFile(audio_path) as source:
-            audio = recognizer.record(source)
-        return recognizer.recognize_google(audio)
+        mono = samples.mean(axis=1) if samples.ndim > 1 else samples
+        pcm16 = (np.clip(mono, -1.0, 1.0) * 32767).astype(np.int16)
+        return recognizer.recognize_google(_pcm16_audio_data(pcm16, sample_rate))
     
     text = await asyncio.to_thread(recognize)
     return text.strip()
 
 
+async def transcribe_with_google(audio_path: str) -> str:
+    """File-path entry point kept for external callers; same path as transcribe()."""
+    samples, sample_rate = await asyncio.to_thread(sf.read, audio_path, dtype="float32")
+    return await transcribe_samples_with_google(samples, sample_rate)
+
+
+async def transcribe_stream(audio_iter: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Send audio to Deepgram's live websocket while it is being recorded and
+    yield each finalized segment, instead of waiting for the whole answer.
+    transcribe() stays on the prerecorded API for callers holding a full buffer."""
+    api_key = settings.deepgram_api_key
+    if not api_key:
+        raise ValueError("DEEPGRAM_API_KEY not configured")
+    
+    from deepgram import AsyncDeepgramClient, LiveOptions, LiveTranscriptionEvents
+    
+    connection = AsyncDeepgramClient(api_key=api_key).listen.asyncwebsocket.v("1")
+    segments: asyncio.Queue = asyncio.Queue()
+    
+    async def on_transcript(_connection, result, **kwargs):
+        if result.is_final:
+            text = result.channel.alternatives[0].transcript.strip()
+            if text:
+                await segments.put(text)
+    
+    async def on_close(_connection, *args, **kwargs):
+        await segments.put(None)
+    
+    connection.on(LiveTranscriptionEvents.Transcript, on_transcript)
+    connection.on(LiveTranscriptionEvents.Close, on_close)
+    
+    options = LiveOptions(
+        model=_DEEPGRAM_PARAMS["model"],
+        language=_DEEPGRAM_PARAMS["language"],
+        punctuate=True,
+        smart_format=False,
+        interim_results=True,
+        endpointing=300,
+    )
+    if not await connection.start(options):
+        raise RuntimeError("Failed to open Deepgram live connection")
+    
+    async def send_audio():
+        try:
+            async for chunk in audio_iter:
+                await connection.send(chunk)
+            # Deepgram flushes the remaining finals; its Close event ends the stream
+            await connection.finish()
+        except Exception:
+            # A failed source or send gets no Close event; unblock the consumer
+            segments.put_nowait(None)
+            raise
+    
+    sender = asyncio.create_task(send_audio())
+    try:
+        while (text := await segments.get()) is not None:
+            yield text
+        # Surface a failing audio source or send instead of ending as if complete
+        await sender
+    finally:
+        if not sender.done():
+            sender.cancel()
+            await connection.finish()
+
+
 async def transcribe(audio_data: bytes, format_hint: str = None) -> str:
     
     if not audio_data or len(audio_data) == 0:
@@ -93,7 +254,8 @@ async def transcribe(audio_data: bytes, format_hint: str = None) -> str:
     
     # Try Deepgram first (faster, more reliable on cloud)
     try:
-        text, confidence = await transcribe_with_deepgram(audio_data)
+        payload = await compress_for_stt(audio_data)
+        text, confidence = await transcribe_with_deepgram(payload)
         
         if text:
             logger.info(f"Deepgram: '{text[:50]}...' (confidence: {confidence:.2f})")
@@ -109,19 +271,30 @@ async def transcribe(audio_data: bytes, format_hint: str = None) -> str:
     except Exception as e:
         logger.warning(f"Deepgram transcription failed: {e}")
     
-    # Fallback to Google STT
-    temp_path = None
+    # Fallback to local faster-whisper when installed
     try:
-        temp_path = await save_to_temp_wav(audio_data, format_hint)
-        text = await transcribe_with_google(temp_path)
+        text, confidence = await transcribe_with_whisper(audio_data)
+        
+        if text:
+            logger.info(f"Whisper: '{text[:50]}...' (confidence: {confidence:.2f})")
+            
+            if confidence < CONFIDENCE_THRESHOLD:
+                logger.warning(f"Low confidence ({confidence:.2f}), asking to repeat")
+                return "[LOW_CONFIDENCE]"
+            
+            return text
+    except Exception as e:
+        logger.warning(f"Whisper transcription failed: {e}")
+    
+    # Fallback to Google STT, decoded in memory (no temp WAV round-trip)
+    try:
+        samples, sample_rate = await load_audio(audio_data)
+        text = await transcribe_samples_with_google(samples, sample_rate)
         logger.info(f"Google STT: '{text[:50]}...'")
         return text
         
     except Exception as e:
         logger.error(f"Google STT also failed: {e}")
-    finally:
-        if temp_path:
-            cleanup_temp_file(temp_path)
     
     logger.error("All STT engines failed")
     return ""
@@ -134,8 +307,27 @@ async def speech_to_text_async(audio_data: bytes) -> str:
 
 def preload_deepgram():
     try:
-        _get_deepgram_client()
-        _get_async_deepgram_client()
-        logger.info("Deepgram clients ready")
+        _get_deepgram_http()
+        logger.info("Deepgram client ready")
     except Exception as e:
         logger.warning(f"Failed to initialize Deepgram: {e}")
+
+
+async def warm_deepgram_connection():
+    """Open the pooled Deepgram connection at startup so the first answer
+    doesn't pay the TLS handshake. Uses the free projects listing rather
+    than a billed transcription."""
+    try:
+        response = await _get_deepgram_http().get(DEEPGRAM_PROJECTS_URL)
+        response.raise_for_status()
+        logger.info("Deepgram connection warmed")
+    except Exception as e:
+        logger.warning(f"Failed to warm Deepgram connection: {e}")
+
+
+def preload_whisper_model():
+    try:
+        if _get_whisper_model() is not None:
+            logger.info("Whisper model ready")
+    except Exception as e:
+        logger.warning(f"Failed to load Whisper model: {e}")
@@ -1,59 +1,140 @@
 import io
 import os
+import re
 import asyncio
-
-import edge_tts
-from gtts import gTTS
+import hashlib
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Optional
 
 from utils.config import settings
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Edge TTS voice catalogue (fetched lazily, refreshed daily)
+_voices = None
+_english_voices = None
+_voices_fetched_at = 0.0
+_VOICES_TTL = 86400
+
+# Recently synthesized Edge audio, keyed by voice/rate/text digest. Canned
+# recruiter lines recur across sessions, so most repeats skip the network.
+# Bounded and memory-only; app.py keeps its own pruned file cache for playback.
+_TTS_CACHE: "OrderedDict[str, bytes]" = OrderedDict()
+_MAX_TTS_CACHE = 128
+
+
+# Markdown characters dropped before speech; "```" goes with them
+_STRIP_TABLE = str.maketrans("", "", "*#`")
+_MULTISPACE_RE = re.compile(r"\s+")
+
 
 def _clean_text(text: str) -> str:
-    replacements = {
-        "**": "", "__": "", "```": "", "`": "",
-        "#": "", "*": "", "\n\n": ". ", "\n": " ",
-    }
+    # "**" goes before "__" so "_**_" still collapses to nothing, then the
+    # single characters, then newlines
+    result = text.replace("**", "").replace("__", "").translate(_STRIP_TABLE)
+    result = result.replace("\n\n", ". ").replace("\n", " ")
     
-    result = text
-    for old, new in replacements.items():
-        result = result.replace(old, new)
+    # Collapse runs of whitespace in one pass
+    return _MULTISPACE_RE.sub(" ", result).strip()
+
+
+def _tts_cache_key(text: str, voice: str, rate: str) -> str:
+    return hashlib.blake2b(f"{voice}\0{rate}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _remember(key: str, audio: bytes):
+    _TTS_CACHE[key] = audio
+    _TTS_CACHE.move_to_end(key)
+    if len(_TTS_CACHE) > _MAX_TTS_CACHE:
+        _TTS_CACHE.popitem(last=False)
+
+
+def _cached_audio(key: str) -> Optional[bytes]:
+    audio = _TTS_CACHE.get(key)
+    if audio is not None:
+        _TTS_CACHE.move_to_end(key)
+    return audio
+
+
+# Sentence boundaries used to split long replies for parallel synthesis
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+MIN_SEGMENT_CHARS = 120
+MAX_PARALLEL_SEGMENTS = 4
+
+
+def _split_segments(text: str) -> list:
+    """Group sentences into segments of at least MIN_SEGMENT_CHARS."""
+    segments, current = [], ""
+    for sentence in _SENTENCE_END_RE.split(text):
+        current = f"{current} {sentence}" if current else sentence
+        if len(current) >= MIN_SEGMENT_CHARS:
+            segments.append(current)
+            current = ""
+    if current:
+        if segments and len(current) < MIN_SEGMENT_CHARS // 2:
+            segments[-1] = f"{segments[-1]} {current}"
+        else:
+            segments.append(current)
+    return segments
+
+
+async def synthesize_edge_stream(text: str, voice: str = None, rate: str = None) -> AsyncIterator[bytes]:
+    """Yield Edge TTS MP3 chunks as they arrive, without buffering or caching."""
+    import edge_tts
     
-    # Remove multiple spaces
-    while "  " in result:
-        result = result.replace("  ", " ")
+    communicate = edge_tts.Communicate(
+        text=text,
+        voice=voice or settings.tts_voice,
+        rate=rate or settings.tts_rate
+    )
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            yield chunk["data"]
+
+
+async def _synthesize_edge_once(text: str, voice: str, rate: str) -> bytes:
+    key = _tts_cache_key(text, voice, rate)
+    cached = _cached_audio(key)
+    if cached is not None:
+        return cached
     
-    return result.strip()
+    audio = b"".join([chunk async for chunk in synthesize_edge_stream(text, voice, rate)])
+    if audio:
+        _remember(key, audio)
+    return audio
 
 
 async def synthesize_edge(text: str, voice: str = None, rate: str = None) -> bytes:
+    """Synthesize with Edge TTS. Long text is split into sentence groups that
+    are requested concurrently; Edge emits the same MP3 format for every
+    request, so the frames concatenate into one playable stream."""
     voice = voice or settings.tts_voice
     rate = rate or settings.tts_rate
     
-    communicate = edge_tts.Communicate(
-        text=text,
-        voice=voice,
-        rate=rate
-    )
+    segments = _split_segments(text)
+    if len(segments) < 2:
+        return await _synthesize_edge_once(text, voice, rate)
     
-    audio_data = io.BytesIO()  # in-memory buffer
-    async for chunk in communicate.stream():
-        if chunk["type"] == "audio":
-            audio_data.write(chunk["data"])
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_SEGMENTS)
+    
+    async def _segment(segment: str) -> bytes:
+        async with semaphore:
+            return await _synthesize_edge_once(segment, voice, rate)
     
-    audio_data.seek(0)
-    return audio_data.read()
+    parts = await asyncio.gather(*(_segment(segment) for segment in segments))
+    logger.info(f"Edge TTS synthesized {len(segments)} segments in parallel")
+    return b"".join(parts)
 
 
 async def synthesize_gtts(text: str, lang: str = "en") -> bytes:
     def _generate():
+        from gtts import gTTS
         tts = gTTS(text=text, lang=lang, slow=False)
         audio_data = io.BytesIO()
         tts.write_to_fp(audio_data)
-        audio_data.seek(0)
-        return audio_data.read()
+        return audio_data.getvalue()
     
     return await asyncio.to_thread(_generate)
 
@@ -84,6 +165,46 @@ async def synthesize(text: str, voice: str = None) -> bytes:
         raise RuntimeError(f"TTS failed: {e}")
 
 
+async def synthesize_stream(text: str, voice: str = None) -> AsyncIterator[bytes]:
+    """Yield MP3 chunks as Edge TTS produces them, falling back to a single
+    gTTS chunk if Edge fails before sending any audio."""
+    if not text or not text.strip():
+        raise ValueError("Text cannot be empty")
+    
+    clean_text = _clean_text(text)
+    voice = voice or settings.tts_voice
+    
+    key = _tts_cache_key(clean_text, voice, settings.tts_rate)
+    cached = _cached_audio(key)
+    if cached is not None:
+        yield cached
+        return
+    
+    sent_audio = False
+    try:
+        parts = []
+        async for chunk in synthesize_edge_stream(clean_text, voice):
+            sent_audio = True
+            parts.append(chunk)
+            yield chunk
+        if parts:
+            _remember(key, b"".join(parts))
+            return
+        logger.warning("Edge TTS returned no audio, trying gTTS fallback...")
+    except Exception as e:
+        if sent_audio:
+            # Part of the MP3 is already on the wire; a second engine can't resume it
+            logger.error(f"Edge TTS stream failed mid-response: {e}")
+            return
+        logger.warning(f"Edge TTS failed: {e}, trying gTTS fallback...")
+    
+    try:
+        yield await synthesize_gtts(clean_text)
+    except Exception as e:
+        logger.error(f"All TTS engines failed: {e}")
+        raise RuntimeError(f"TTS failed: {e}")
+
+
 async def save_audio(text: str, output_path: str, voice: str = None) -> str:
     audio_bytes = await synthesize(text, voice)
     
@@ -96,12 +217,21 @@ async def save_audio(text: str, output_path: str, voice: str = None) -> str:
 
 
 async def list_voices() -> list:
-    return await edge_tts.list_voices()
+    # The catalogue changes at most daily; refetch only once it has gone stale
+    global _voices, _english_voices, _voices_fetched_at
+    
+    if _voices is None or time.monotonic() - _voices_fetched_at > _VOICES_TTL:
+        import edge_tts
+        _voices = await edge_tts.list_voices()
+        _english_voices = [v for v in _voices if v["Locale"].startswith("en-")]
+        _voices_fetched_at = time.monotonic()
+    
+    return _voices
 
 
 async def list_english_voices() -> list:
-    voices = await edge_tts.list_voices()
-    return [v for v in voices if v["Locale"].startswith("en-")]
+    await list_voices()
+    return _english_voices
 
 
 # Convenience aliases for backward compatibility